@@ -0,0 +1,39 @@
+from utils import setup_environment, measure, print_table
+
+setup_environment()
+
+from core.models import User
+from api.auth.schemas import JWTType
+from api.auth.service import AuthAPIService
+from api.auth.keys import keyring
+from api.auth.token_cache import verified_tokens
+
+
+def main() -> None:
+    keyring.load()
+    service = AuthAPIService(session=None)  # token helpers never touch the session
+    user = User(id=1, email="bench@example.com", is_activated=True)
+    token = service.create_token(token_type=JWTType.ACCESS, user=user)
+
+    def decode_uncached() -> None:
+        verified_tokens.cache.clear()
+        service.decode_jwt(token)
+
+    def decode_cached() -> None:
+        service.decode_jwt(token)
+
+    results = {
+        "decode_jwt (verify + validate)": measure(decode_uncached),
+        "decode_jwt (verified cache)": measure(decode_cached, iterations=100_000),
+    }
+    print_table(results)
+
+    uncached = results["decode_jwt (verify + validate)"]["mean_us"]
+    cached = results["decode_jwt (verified cache)"]["mean_us"]
+    print(
+        f"\ncpu saved per request: {uncached - cached:.1f} us ({uncached / cached:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
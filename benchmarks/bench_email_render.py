@@ -0,0 +1,61 @@
+import tempfile
+from email.message import EmailMessage
+from email.policy import SMTP as SMTP_POLICY
+from pathlib import Path
+
+from utils import setup_environment, measure, print_table
+
+setup_environment()
+
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+
+from core import settings
+from core.mail import mailer
+
+
+def main() -> None:
+    env = Environment(loader=FileSystemLoader(settings.email.templates_dir))
+    bytecode_dir = Path(tempfile.mkdtemp())
+
+    # what every send did before: template lookup, render and a fresh MIME tree
+    def render_per_message() -> None:
+        message = EmailMessage()
+        message["From"] = settings.email.sender
+        message["To"] = "bench@example.com"
+        message["Subject"] = settings.email.default_subject
+        message.set_content(settings.email.default_plain_text)
+        message.add_alternative(
+            env.get_template(settings.email.template_name).render(code="123456"),
+            subtype="html",
+        )
+        message.as_bytes(policy=SMTP_POLICY)
+
+    def render_precompiled() -> None:
+        mailer.renderer.render("123456", "bench@example.com")
+
+    def compile_template() -> None:
+        Environment(loader=FileSystemLoader(settings.email.templates_dir)).get_template(
+            settings.email.template_name
+        )
+
+    def compile_template_cached() -> None:
+        Environment(
+            loader=FileSystemLoader(settings.email.templates_dir),
+            bytecode_cache=FileSystemBytecodeCache(str(bytecode_dir)),
+        ).get_template(settings.email.template_name)
+
+    results = {
+        "render per message": measure(render_per_message, iterations=5_000),
+        "precompiled render": measure(render_precompiled, iterations=100_000),
+        "compile template": measure(compile_template, iterations=500),
+        "compile (bytecode cache)": measure(compile_template_cached, iterations=500),
+    }
+    print_table(results)
+
+    before = results["render per message"]["mean_us"]
+    after = results["precompiled render"]["mean_us"]
+    print(f"\nrender speedup: {before / after:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import jwt
+from datetime import datetime, timezone, timedelta
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa, ec, ed25519
+
+from utils import measure, print_table
+
+
+def generate_keys():
+    return {
+        "RS256": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "ES256": ec.generate_private_key(ec.SECP256R1()),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate(),
+    }
+
+
+def to_pem(private_key) -> tuple[bytes, bytes]:
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return private_pem, public_pem
+
+
+def main() -> None:
+    now = datetime.now(timezone.utc)
+    claims = {
+        "sub": "1",
+        "email": "bench@example.com",
+        "is_activated": True,
+        "iat": now,
+        "exp": now + timedelta(minutes=10),
+        "typ": "access",
+    }
+
+    results = {}
+    for algorithm, private_key in generate_keys().items():
+        public_key = private_key.public_key()
+        private_pem, public_pem = to_pem(private_key)
+        token = jwt.encode(claims, private_key, algorithm=algorithm)
+
+        if algorithm == "RS256":
+            # what JWTSettings used to do: hand PyJWT the PEM text on every call
+            results["RS256 sign (PEM per call)"] = measure(
+                lambda: jwt.encode(claims, private_pem, algorithm=algorithm),
+                iterations=300,
+            )
+            results["RS256 verify (PEM per call)"] = measure(
+                lambda: jwt.decode(token, public_pem, algorithms=[algorithm])
+            )
+
+        results[f"{algorithm} sign"] = measure(
+            lambda: jwt.encode(claims, private_key, algorithm=algorithm),
+            iterations=300,
+        )
+        results[f"{algorithm} verify"] = measure(
+            lambda: jwt.decode(token, public_key, algorithms=[algorithm])
+        )
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
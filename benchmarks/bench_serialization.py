@@ -0,0 +1,82 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from utils import setup_environment, summarize, print_table, ASGIClient
+
+setup_environment()
+
+from fastapi import FastAPI
+
+from core.models import User, Profile
+from core.serialization import json_response
+from api.users.schemas import UsersPageSchema
+
+PAGE_SIZE = 500
+
+
+def build_page() -> dict:
+    created_at = datetime.now(timezone.utc)
+    users = [
+        User(
+            id=idx,
+            username=f"user{idx}",
+            email=f"user{idx}@example.com",
+            created_at=created_at,
+            is_activated=bool(idx % 2),
+            profile=Profile(
+                id=idx, user_id=idx, first_name="First", last_name="Last", bio="bio"
+            ),
+        )
+        for idx in range(1, PAGE_SIZE + 1)
+    ]
+    return {"items": users, "next_cursor": "cursor"}
+
+
+async def measure_route(client: ASGIClient, path: str, iterations: int) -> dict:
+    for _ in range(5):
+        await client.request("GET", path)
+
+    timings = []
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        status, _ = await client.request("GET", path)
+        timings.append(time.perf_counter() - started_at)
+        assert status == 200
+    return summarize(timings)
+
+
+async def main() -> None:
+    page = build_page()
+    app = FastAPI()
+
+    # what handle_get_users did before: FastAPI validates and encodes the result
+    @app.get("/response-model", response_model=UsersPageSchema)
+    async def handle_response_model():
+        return page
+
+    @app.get("/json-response", response_model=UsersPageSchema)
+    async def handle_json_response():
+        return json_response(UsersPageSchema, page)
+
+    client = ASGIClient(app)
+    _, legacy_body = await client.request("GET", "/response-model")
+    _, fast_body = await client.request("GET", "/json-response")
+    assert legacy_body.replace(b" ", b"") == fast_body.replace(b" ", b"")
+
+    results = {
+        f"response_model ({PAGE_SIZE} users)": await measure_route(
+            client, "/response-model", 200
+        ),
+        f"json_response ({PAGE_SIZE} users)": await measure_route(
+            client, "/json-response", 200
+        ),
+    }
+    print_table(results)
+
+    before, after = (stats["mean_us"] for stats in results.values())
+    print(f"\nserialization speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
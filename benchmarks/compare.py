@@ -0,0 +1,39 @@
+import sys
+import json
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main() -> None:
+    if len(sys.argv) != 3:
+        sys.exit("usage: compare.py BASELINE.json RESULTS.json")
+
+    baseline, current = load(sys.argv[1]), load(sys.argv[2])
+    print(f"baseline {baseline['commit']}\ncurrent  {current['commit']}\n")
+    print(
+        f"{'case':<32}{'p50 us':>12}{'p50 Δ':>10}"
+        f"{'p99 us':>12}{'p99 Δ':>10}{'ops/s Δ':>10}"
+    )
+
+    for name, stats in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<32}{stats['p50_us']:>12.1f}{'new':>10}")
+            continue
+
+        def change(key: str) -> str:
+            if not before[key]:
+                return "-"
+            return f"{(stats[key] / before[key] - 1) * 100:+.1f}%"
+
+        print(
+            f"{name:<32}{stats['p50_us']:>12.1f}{change('p50_us'):>10}"
+            f"{stats['p99_us']:>12.1f}{change('p99_us'):>10}{change('ops_per_sec'):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
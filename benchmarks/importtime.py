@@ -0,0 +1,64 @@
+"""Startup profile: import time of the app and its heaviest modules.
+
+    python3 benchmarks/importtime.py --budget-ms 1500
+    python3 benchmarks/importtime.py --module core.models --budget-ms 600
+
+Exits with 1 when the median import time is over the budget.
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+from utils import SRC_DIR, setup_environment
+
+
+def import_profile(module: str) -> dict[str, tuple[int, int]]:
+    # -X importtime reports "self us | cumulative us | module" on stderr
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        env=os.environ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if self_us.strip().isdigit():
+            profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    setup_environment()
+    # the first run also warms the bytecode cache
+    profiles = [import_profile(args.module) for _ in range(args.runs + 1)][1:]
+    totals = [profile[args.module][1] / 1000 for profile in profiles]
+    total_ms = statistics.median(totals)
+
+    print(f"{'module':<48}{'self ms':>10}{'total ms':>10}")
+    last = profiles[-1]
+    heaviest = sorted(last.items(), key=lambda item: item[1][0], reverse=True)
+    for name, (self_us, cumulative_us) in heaviest[: args.top]:
+        print(f"{name:<48}{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}")
+
+    print(f"\nimport {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if total_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
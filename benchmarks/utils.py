@@ -0,0 +1,133 @@
+import os
+import json
+import asyncio
+import sys
+import time
+import statistics
+from pathlib import Path
+from typing import Callable, Any
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+
+def setup_environment() -> None:
+    # benchmarks only need settings to load, not reachable services
+    os.environ.setdefault("DB__HOST", "localhost")
+    os.environ.setdefault("DB__PORT", "5432")
+    os.environ.setdefault("DB__USER", "bench")
+    os.environ.setdefault("DB__PASS", "bench")
+    os.environ.setdefault("DB__NAME", "bench")
+    os.environ.setdefault("RABBITMQ__USER", "bench")
+    os.environ.setdefault("RABBITMQ__PASS", "bench")
+    os.environ.setdefault("TASKIQ__BROKER", "inmemory")
+
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+
+
+def measure(
+    func: Callable[[], Any],
+    iterations: int = 1000,
+    warmup: int = 50,
+) -> dict[str, float]:
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started_at)
+
+    return summarize(timings)
+
+
+def summarize(timings: list[float]) -> dict[str, float]:
+    timings = sorted(timings)
+    total = sum(timings)
+    return {
+        "iterations": len(timings),
+        "mean_us": statistics.fmean(timings) * 1e6,
+        "p50_us": percentile(timings, 50) * 1e6,
+        "p95_us": percentile(timings, 95) * 1e6,
+        "p99_us": percentile(timings, 99) * 1e6,
+        "ops_per_sec": len(timings) / total if total else 0.0,
+    }
+
+
+def percentile(sorted_timings: list[float], pct: float) -> float:
+    if not sorted_timings:
+        return 0.0
+    idx = min(len(sorted_timings) - 1, round(pct / 100 * (len(sorted_timings) - 1)))
+    return sorted_timings[idx]
+
+
+def print_table(results: dict[str, dict[str, float]]) -> None:
+    print(f"{'case':<32}{'mean us':>12}{'p50 us':>12}{'p99 us':>12}{'ops/s':>12}")
+    for name, stats in results.items():
+        print(
+            f"{name:<32}{stats['mean_us']:>12.1f}{stats['p50_us']:>12.1f}"
+            f"{stats['p99_us']:>12.1f}{stats['ops_per_sec']:>12.0f}"
+        )
+
+
+class ASGIClient:
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: Any = None,
+        token: str | None = None,
+    ) -> tuple[int, bytes]:
+        path, _, query = path.partition("?")
+        headers = [(b"host", b"bench")]
+        content = b""
+
+        if body is not None:
+            content = json.dumps(body).encode()
+            headers.append((b"content-type", b"application/json"))
+        if token is not None:
+            headers.append((b"authorization", f"Bearer {token}".encode()))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+        sent = False
+        status = 0
+        chunks: list[bytes] = []
+        # streaming responses listen for a disconnect while they send the body
+        finished = asyncio.Event()
+
+        async def receive() -> dict[str, Any]:
+            nonlocal sent
+            if sent:
+                await finished.wait()
+                return {"type": "http.disconnect"}
+            sent = True
+            return {"type": "http.request", "body": content, "more_body": False}
+
+        async def send(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    finished.set()
+
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
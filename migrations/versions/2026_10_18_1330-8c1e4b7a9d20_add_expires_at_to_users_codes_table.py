@@ -0,0 +1,43 @@
+"""add expires_at to users_codes table
+
+Revision ID: 8c1e4b7a9d20
+Revises: f303454712a1
+Create Date: 2026-10-18 13:30:12.417093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c1e4b7a9d20"
+down_revision: Union[str, Sequence[str], None] = "f303454712a1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # codes issued before this column existed are treated as already expired
+    op.add_column(
+        "users_codes",
+        sa.Column(
+            "expires_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.alter_column("users_codes", "expires_at", server_default=None)
+    op.create_index(
+        "ix_user_code_expires_at", "users_codes", ["expires_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_user_code_expires_at", table_name="users_codes")
+    op.drop_column("users_codes", "expires_at")
@@ -0,0 +1,71 @@
+"""add users search indexes
+
+Revision ID: 3f6a2d9c8b41
+Revises: 8c1e4b7a9d20
+Create Date: 2026-10-18 15:00:41.602318
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6a2d9c8b41"
+down_revision: Union[str, Sequence[str], None] = "8c1e4b7a9d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_INDEXES = [
+    ("ix_user_username_lower_pattern", "lower(username) text_pattern_ops", "btree"),
+    ("ix_user_email_lower_pattern", "lower(email) text_pattern_ops", "btree"),
+    ("ix_user_username_lower_trgm", "lower(username) gin_trgm_ops", "gin"),
+    ("ix_user_email_lower_trgm", "lower(email) gin_trgm_ops", "gin"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # built concurrently so a large users table stays writable meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_created_at",
+            "users",
+            ["created_at"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, expression, method in SEARCH_INDEXES:
+            op.create_index(
+                name,
+                "users",
+                [sa.text(expression)],
+                unique=False,
+                postgresql_using=method,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(SEARCH_INDEXES):
+            op.drop_index(
+                name,
+                table_name="users",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+        op.drop_index(
+            "ix_user_created_at",
+            table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
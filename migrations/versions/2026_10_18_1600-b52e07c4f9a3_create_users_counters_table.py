@@ -0,0 +1,45 @@
+"""create users_counters table
+
+Revision ID: b52e07c4f9a3
+Revises: 3f6a2d9c8b41
+Create Date: 2026-10-18 16:00:27.841530
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b52e07c4f9a3"
+down_revision: Union[str, Sequence[str], None] = "3f6a2d9c8b41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users_counters",
+        sa.Column("is_activated", sa.Boolean(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("is_activated", name="uq_user_counter_is_activated"),
+    )
+    # the users table is locked for the seed so no insert slips in between
+    op.execute("LOCK TABLE users IN SHARE MODE")
+    op.execute(
+        """
+        INSERT INTO users_counters (is_activated, count)
+        SELECT flag, (SELECT count(*) FROM users WHERE is_activated = flag)
+        FROM (VALUES (false), (true)) AS flags (flag)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("users_counters")
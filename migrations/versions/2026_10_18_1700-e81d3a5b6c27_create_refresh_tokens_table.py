@@ -0,0 +1,48 @@
+"""create refresh_tokens table
+
+Revision ID: e81d3a5b6c27
+Revises: b52e07c4f9a3
+Create Date: 2026-10-18 17:00:41.215093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e81d3a5b6c27"
+down_revision: Union[str, Sequence[str], None] = "b52e07c4f9a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("jti", sa.String(length=32), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("used_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("jti", name="uq_refresh_token_jti"),
+    )
+    op.create_index(
+        "ix_refresh_token_user_id", "refresh_tokens", ["user_id"], unique=False
+    )
+    op.create_index(
+        "ix_refresh_token_expires_at", "refresh_tokens", ["expires_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_refresh_token_expires_at", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_token_user_id", table_name="refresh_tokens")
+    op.drop_table("refresh_tokens")
@@ -0,0 +1,59 @@
+"""add stale users purge indexes
+
+Revision ID: c4a9e2f17b58
+Revises: e81d3a5b6c27
+Create Date: 2026-10-18 18:00:09.572614
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a9e2f17b58"
+down_revision: Union[str, Sequence[str], None] = "e81d3a5b6c27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # built concurrently so users and profiles stay writable meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_created_at_not_activated",
+            "users",
+            ["created_at"],
+            unique=False,
+            postgresql_where=sa.text("NOT is_activated"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_profile_user_id",
+            "profiles",
+            ["user_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_profile_user_id",
+            table_name="profiles",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_user_created_at_not_activated",
+            table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,41 @@
+"""create tasks_runs table
+
+Revision ID: a7d3f08e5c12
+Revises: c4a9e2f17b58
+Create Date: 2026-10-18 19:00:41.205716
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d3f08e5c12"
+down_revision: Union[str, Sequence[str], None] = "c4a9e2f17b58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "tasks_runs",
+        sa.Column("task_name", sa.String(length=128), nullable=False),
+        sa.Column("runs", sa.BigInteger(), nullable=False),
+        sa.Column("processed_total", sa.BigInteger(), nullable=False),
+        sa.Column("last_processed", sa.BigInteger(), nullable=False),
+        sa.Column("last_batches", sa.Integer(), nullable=False),
+        sa.Column("last_seconds", sa.Float(), nullable=False),
+        sa.Column("last_finished_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("task_name", name="uq_task_run_task_name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("tasks_runs")
@@ -2,8 +2,12 @@ from fastapi import APIRouter
 
 from .users import users_router
 from .auth import auth_router
+from .profiles.routes import router as profiles_router
+from .monitoring import monitoring_router
 
 
 main_api_router = APIRouter(prefix="/api")
 main_api_router.include_router(users_router)
 main_api_router.include_router(auth_router)
+main_api_router.include_router(profiles_router)
+main_api_router.include_router(monitoring_router)
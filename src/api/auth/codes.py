@@ -0,0 +1,67 @@
+import secrets
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import select, update, delete, func, Row
+from sqlalchemy.dialects.postgresql import insert
+
+from core import settings, BaseAPIService
+from core.models import User, UserCode
+
+
+class ActivationCodeStore(BaseAPIService):
+    async def issue(self, user_id: int) -> tuple[str, datetime]:
+        code = self.generate_code()
+        expires_at = datetime.now(timezone.utc) + timedelta(
+            minutes=settings.codes.ttl_minutes
+        )
+
+        stmt = insert(UserCode).values(
+            user_id=user_id, code=code, expires_at=expires_at
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserCode.user_id],
+            set_={"code": stmt.excluded.code, "expires_at": stmt.excluded.expires_at},
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+        return code, expires_at
+
+    # consumes a valid code and activates its user in a single statement:
+    # WITH redeemed AS (DELETE FROM users_codes ... RETURNING user_id)
+    # UPDATE users ... FROM redeemed RETURNING ...
+    async def redeem(self, user_id: int, code: str) -> Row | None:
+        redeemed = (
+            delete(UserCode)
+            .where(
+                UserCode.user_id == user_id,
+                UserCode.code == code,
+                UserCode.expires_at > func.now(),
+            )
+            .returning(UserCode.user_id)
+            .cte("redeemed")
+        )
+        stmt = (
+            update(User)
+            .where(User.id == redeemed.c.user_id, User.is_activated.is_(False))
+            .values(is_activated=True)
+            .returning(User.id, User.email, User.is_activated)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.one_or_none()
+
+    async def purge_expired(self, batch_size: int) -> int:
+        expired_ids = (
+            select(UserCode.id)
+            .where(UserCode.expires_at < func.now())
+            .order_by(UserCode.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = delete(UserCode).where(UserCode.id.in_(expired_ids.scalar_subquery()))
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def generate_code() -> str:
+        return str(secrets.randbelow(900000) + 100000)
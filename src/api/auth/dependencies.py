@@ -1,15 +1,23 @@
+import hmac
 from typing import Annotated
 from fastapi import Depends
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, APIKeyHeader
 
+from core import settings
 from core.models import User
-from api.users.service import service_dep as users_service_dep
-from .exc import InvalidTokenTypeException
+from api.users.service import UserAPIService, read_service_dep as users_service_dep
+from api.users.cache import user_cache
+from .exc import (
+    InvalidTokenTypeException,
+    AdminAPIDisabledException,
+    InvalidAdminKeyException,
+)
 from .schemas import PayloadSchema, JWTType
 from .service import service_dep
 
 
 http_bearer = HTTPBearer()
+admin_key_header = APIKeyHeader(name="X-Admin-Key", auto_error=False)
 
 
 def token_dependency(
@@ -19,11 +27,11 @@ def token_dependency(
     return token
 
 
-def payload_dependency(
+async def payload_dependency(
     service: service_dep,
     token: Annotated[str, Depends(token_dependency)],
 ) -> PayloadSchema:
-    payload = service.decode_jwt(token)
+    payload = await service.authenticate(token)
     return payload
 
 
@@ -33,6 +41,37 @@ async def user_dependency(
 ) -> User:
     if payload.typ != JWTType.ACCESS:
         raise InvalidTokenTypeException()
+    return await get_user(users_service, int(payload.sub))
 
-    user_id = int(payload.sub)
-    return await users_service.get_user_by_id(user_id)
+
+async def refresh_user_dependency(
+    users_service: users_service_dep,
+    payload: Annotated[PayloadSchema, Depends(payload_dependency)],
+) -> User:
+    if payload.typ != JWTType.REFRESH:
+        raise InvalidTokenTypeException(JWTType.REFRESH)
+    return await get_user(users_service, int(payload.sub))
+
+
+async def get_user(users_service: UserAPIService, user_id: int) -> User:
+    user = await user_cache.get(user_id)
+
+    if user is None:
+        user = await users_service.get_user_by_id(user_id)
+        # the route may need a primary connection of its own, don't hold two
+        await users_service.session.close()
+        await user_cache.set(user)
+    return user
+
+
+def admin_dependency(
+    key: Annotated[str | None, Depends(admin_key_header)],
+) -> None:
+    api_key = settings.admin.api_key
+
+    if api_key is None:
+        raise AdminAPIDisabledException()
+    if key is None or not hmac.compare_digest(
+        key.encode(), api_key.get_secret_value().encode()
+    ):
+        raise InvalidAdminKeyException()
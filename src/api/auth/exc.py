@@ -27,6 +27,22 @@ class TokenDecodeException(HTTPException):
         )
 
 
+class TokenRevokedException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="token has been revoked",
+        )
+
+
+class RefreshTokenReusedException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="refresh token reuse detected, all sessions revoked",
+        )
+
+
 class InvalidTokenTypeException(HTTPException):
     def __init__(self, token_type: JWTType = JWTType.ACCESS) -> None:
         super().__init__(
@@ -35,9 +51,33 @@ class InvalidTokenTypeException(HTTPException):
         )
 
 
+class InvalidConfirmationCodeException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="invalid or expired confirmation code",
+        )
+
+
 class UserAlreadyActivatedException(HTTPException):
     def __init__(self) -> None:
         super().__init__(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"user already activated",
         )
+
+
+class AdminAPIDisabledException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="admin api is disabled",
+        )
+
+
+class InvalidAdminKeyException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="invalid admin key",
+        )
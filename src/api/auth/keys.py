@@ -0,0 +1,70 @@
+import jwt
+from typing import Any
+from jwt.exceptions import DecodeError
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+
+from core import settings
+from core.config import JWTKeySettings
+
+
+class JWTKey:
+    def __init__(self, config: JWTKeySettings) -> None:
+        self.kid = config.kid
+        self.algorithm = config.algorithm
+        self.public_key = load_pem_public_key(config.public_key_path.read_bytes())
+        self.private_key = None
+
+        if config.private_key_path is not None:
+            self.private_key = load_pem_private_key(
+                config.private_key_path.read_bytes(), password=None
+            )
+
+
+# PEM files are parsed once into cryptography key objects which PyJWT uses as is
+class KeyRing:
+    def __init__(self) -> None:
+        self._keys: dict[str, JWTKey] | None = None
+
+    @property
+    def keys(self) -> dict[str, JWTKey]:
+        if self._keys is None:
+            self.load()
+        return self._keys
+
+    @property
+    def active(self) -> JWTKey:
+        return self.keys[settings.jwt.active_kid]
+
+    def load(self) -> None:
+        keys = {config.kid: JWTKey(config) for config in settings.jwt.keys}
+
+        active = keys.get(settings.jwt.active_kid)
+        if active is None or active.private_key is None:
+            raise RuntimeError(
+                f"active JWT key '{settings.jwt.active_kid}' must have a private key"
+            )
+        self._keys = keys
+
+    def sign(self, claims: dict[str, Any]) -> str:
+        key = self.active
+        return jwt.encode(
+            payload=claims,
+            key=key.private_key,
+            algorithm=key.algorithm,
+            headers={"kid": key.kid},
+        )
+
+    def verify(self, token: str) -> dict[str, Any]:
+        kid = jwt.get_unverified_header(token).get("kid", settings.jwt.active_kid)
+        key = self.keys.get(kid)
+
+        if key is None:
+            raise DecodeError(f"unknown key id: {kid}")
+
+        return jwt.decode(jwt=token, key=key.public_key, algorithms=[key.algorithm])
+
+
+keyring = KeyRing()
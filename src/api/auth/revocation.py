@@ -0,0 +1,78 @@
+import time
+from functools import cached_property
+from typing import Any
+
+from core import settings
+from core.cache import TTLCache, SharedCacheBackend, create_shared_backend
+from .schemas import PayloadSchema
+
+
+# per-user "not issued before" cutoffs, checked on every decoded token so
+# revoked sessions are rejected without a database lookup. An entry only has
+# to outlive the access tokens it cuts off: refresh tokens are always checked
+# against the refresh_tokens table when they are rotated.
+# With a shared cache url the cutoffs live in redis so every process sees them;
+# the local tier then only holds lookups for revocation_sync_seconds.
+class RevocationList:
+    def __init__(self) -> None:
+        self.rejected = 0
+        self.shared_lookups = 0
+
+    @cached_property
+    def cutoffs(self) -> TTLCache:
+        return TTLCache(
+            max_size=settings.jwt.revocation_cache_size,
+            ttl=settings.jwt.revocation_sync_seconds,
+        )
+
+    @cached_property
+    def shared(self) -> SharedCacheBackend | None:
+        return create_shared_backend(settings.cache.shared_url)
+
+    @cached_property
+    def prefix(self) -> str:
+        return f"{settings.cache.shared_key_prefix}revoked:"
+
+    # tokens carry a sub-second "iat", so a login right after the revocation
+    # is not cut off with the sessions it replaces
+    async def revoke_user(self, user_id: int) -> None:
+        cutoff = time.time()
+        ttl = settings.jwt.access_token_expire_minutes * 60
+
+        if self.shared is None:
+            self.cutoffs.set(user_id, cutoff, ttl=ttl)
+            return
+
+        self.cutoffs.set(user_id, cutoff)
+        await self.shared.set(self.__key(user_id), repr(cutoff).encode(), ex=ttl)
+
+    async def is_revoked(self, payload: PayloadSchema) -> bool:
+        user_id = int(payload.sub)
+        cutoff = self.cutoffs.get(user_id)
+
+        if cutoff is None and self.shared is not None:
+            self.shared_lookups += 1
+            raw = await self.shared.get(self.__key(user_id))
+            # users without a cutoff are remembered too, as 0
+            cutoff = float(raw) if raw is not None else 0.0
+            self.cutoffs.set(user_id, cutoff)
+
+        if cutoff is None or payload.iat.timestamp() > cutoff:
+            return False
+
+        self.rejected += 1
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self.cutoffs),
+            "max_size": self.cutoffs.max_size,
+            "shared_lookups": self.shared_lookups,
+            "rejected": self.rejected,
+        }
+
+    def __key(self, user_id: int) -> str:
+        return f"{self.prefix}{user_id}"
+
+
+revoked_tokens = RevocationList()
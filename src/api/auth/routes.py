@@ -1,13 +1,16 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, status
 
 from core.models import User
+from core.rate_limit import limiter
+from core.serialization import json_response
 from .service import service_dep, email_service_dep
 from .schemas import (
     AuthCredentialsSchema,
     AccessTokenSchema,
     PayloadSchema,
     ConfirmCodeSchema,
+    ActivationCodeSentSchema,
 )
 from . import dependencies as deps
 
@@ -17,26 +20,43 @@ router = APIRouter(prefix="/auth", tags=["Аутентификация"])
 
 @router.post("/login", response_model=AccessTokenSchema)
 async def handle_login_user(
+    request: Request,
     service: service_dep,
     credentials: AuthCredentialsSchema,
 ):
-    return await service.auth_user(credentials=credentials)
+    await limiter.check(
+        "login",
+        ip=request.client and request.client.host,
+        username=credentials.username.lower(),
+    )
+    token_schema = await service.auth_user(credentials=credentials)
+    return json_response(AccessTokenSchema, token_schema)
 
 
 @router.get("/refresh", response_model=AccessTokenSchema)
 async def handle_refresh_access_token(
     service: service_dep,
-    user: Annotated[User, Depends(deps.user_dependency)],
+    user: Annotated[User, Depends(deps.refresh_user_dependency)],
     payload: Annotated[PayloadSchema, Depends(deps.payload_dependency)],
 ):
-    return await service.refresh_token(user, payload)
+    token_schema = await service.refresh_token(user, payload)
+    return json_response(AccessTokenSchema, token_schema)
+
+
+@router.post("/logout", response_model=None, status_code=status.HTTP_204_NO_CONTENT)
+async def handle_logout_user(
+    service: service_dep,
+    user: Annotated[User, Depends(deps.user_dependency)],
+):
+    return await service.revoke_sessions(user.id)
 
 
-@router.get("/get-activate-code", response_model=ConfirmCodeSchema)
+@router.get("/get-activate-code", response_model=ActivationCodeSentSchema)
 async def handle_generate_confirm_code(
     email_service: email_service_dep,
     payload: Annotated[PayloadSchema, Depends(deps.payload_dependency)],
 ):
+    await limiter.check("activation_code", user=payload.sub, email=payload.email)
     return await email_service.send_activation_code(payload)
 
 
@@ -44,5 +64,8 @@ async def handle_generate_confirm_code(
 async def handle_activate_user(
     service: service_dep,
     payload: Annotated[PayloadSchema, Depends(deps.payload_dependency)],
+    schema: ConfirmCodeSchema,
 ):
-    return await service.activate_user(payload)
+    await limiter.check("activate", user=payload.sub)
+    token_schema = await service.activate_user(payload, schema)
+    return json_response(AccessTokenSchema, token_schema)
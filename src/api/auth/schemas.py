@@ -22,6 +22,7 @@ class PayloadSchema(BaseModel):
     iat: datetime
     exp: datetime
     typ: JWTType
+    jti: str | None = None
 
 
 class AccessTokenSchema(BaseModel):
@@ -32,3 +33,7 @@ class AccessTokenSchema(BaseModel):
 
 class ConfirmCodeSchema(BaseModel):
     code: Annotated[str, Len(6, 6)]
+
+
+class ActivationCodeSentSchema(BaseModel):
+    expires_at: datetime
@@ -1,49 +1,59 @@
-import jwt
-import bcrypt
-import secrets
-import aiosmtplib
+import uuid
 from typing import Annotated
 from fastapi import Depends
-from email.message import EmailMessage
 from datetime import datetime, timezone, timedelta
-from jwt.exceptions import ExpiredSignatureError, DecodeError
-
-from core import settings
-from core.models import User, helper
-from api.users.service import UserAPIService
+from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
+from sqlalchemy import select, Row
+
+from core import settings, BaseAPIService
+from core.models import User
+from core.hashing import hasher
+from core.timing import stage
+from api.users.cache import mark_users_changed
+from api.users.counts import adjust_user_counters
+from api.users.exc import UserNotFoundException
+from tasks.email import send_activation_code_task
 from .schemas import (
     PayloadSchema,
     JWTType,
     AccessTokenSchema,
     AuthCredentialsSchema,
     ConfirmCodeSchema,
+    ActivationCodeSentSchema,
 )
+from .codes import ActivationCodeStore
+from .keys import keyring
+from .revocation import revoked_tokens
+from .token_cache import verified_tokens
+from .tokens import RefreshTokenStore
 from . import exc
 
 
-class AuthAPIService:
-    def __init__(self) -> None:
-        self.public_key = settings.jwt.public_key
-        self.private_key = settings.jwt.private_key
-        self.algorithm = settings.jwt.algorithm
-
+class AuthAPIService(BaseAPIService):
     async def auth_user(
         self,
         credentials: AuthCredentialsSchema,
     ) -> AccessTokenSchema:
-        async with helper.session_factory() as session:
-            users_service = UserAPIService(session=session)
-            user = await users_service.get_user_by(
-                need_raise_exception=False,
-                username=credentials.username,
-            )
+        stmt = select(User.id, User.email, User.is_activated, User.password).where(
+            User.username == credentials.username
+        )
+        result = await self.session.execute(stmt)
+        user = result.one_or_none()
+        # give the connection back to the pool before waiting on bcrypt
+        await self.session.close()
+
+        with stage("bcrypt"):
+            is_valid = user and await hasher.verify(credentials.password, user.password)
 
-        if not user or not self.__verify(credentials.password, user.password):
+        if not is_valid:
             raise exc.InvalidCredentialsException()
 
-        token_schema = self.get_token_schema(user)
+        token_schema = await self.issue_tokens(user)
+        await self.session.commit()
         return token_schema
 
+    # every refresh token is single use: it is swapped for a new pair and a
+    # second use of it revokes all sessions of the user
     async def refresh_token(
         self,
         user: User,
@@ -52,69 +62,114 @@ class AuthAPIService:
         if payload.typ != JWTType.REFRESH:
             raise exc.InvalidTokenTypeException(JWTType.REFRESH)
 
-        token_schema = self.get_token_schema(user=user)
+        tokens = RefreshTokenStore(self.session)
+        rotated = payload.jti and await tokens.rotate(user.id, payload.jti)
+
+        if rotated is False:
+            await self.revoke_sessions(user.id)
+            raise exc.RefreshTokenReusedException()
+        elif not rotated:
+            await self.session.rollback()
+            raise exc.TokenRevokedException()
+
+        token_schema = await self.issue_tokens(user)
+        await self.session.commit()
         return token_schema
 
-    def get_token_schema(self, user: User) -> AccessTokenSchema:
+    async def revoke_sessions(self, user_id: int) -> None:
+        await RefreshTokenStore(self.session).revoke_user(user_id)
+        await self.session.commit()
+        await revoked_tokens.revoke_user(user_id)
+
+    # the refresh token row is added to the caller's transaction
+    async def issue_tokens(self, user: User | Row) -> AccessTokenSchema:
         access_token = self.create_token(token_type=JWTType.ACCESS, user=user)
-        refresh_token = self.create_token(token_type=JWTType.REFRESH, user=user)
+        refresh_payload = self.create_payload(token_type=JWTType.REFRESH, user=user)
+        await RefreshTokenStore(self.session).issue(
+            user.id, refresh_payload.jti, refresh_payload.exp
+        )
         return AccessTokenSchema(
             access_token=access_token,
-            refresh_token=refresh_token,
+            refresh_token=self.encode_jwt(refresh_payload),
         )
 
     def encode_jwt(self, payload: PayloadSchema) -> str:
-        token = jwt.encode(
-            payload=payload.model_dump(),
-            key=self.private_key,
-            algorithm=self.algorithm,
-        )
+        claims = payload.model_dump()
+        # pyjwt would truncate a datetime "iat" to whole seconds, revocation
+        # cutoffs need it exact
+        claims["iat"] = payload.iat.timestamp()
+        with stage("jwt_sign"):
+            token = keyring.sign(claims)
         return token
 
     def decode_jwt(self, token: str) -> PayloadSchema:
+        payload = verified_tokens.get(token)
+
+        if payload is None:
+            payload = self.verify_jwt(token)
+            verified_tokens.set(token, payload)
+        return payload
+
+    async def authenticate(self, token: str) -> PayloadSchema:
+        payload = self.decode_jwt(token)
+
+        if await revoked_tokens.is_revoked(payload):
+            raise exc.TokenRevokedException()
+        return payload
+
+    def verify_jwt(self, token: str) -> PayloadSchema:
         try:
-            payload = jwt.decode(
-                jwt=token,
-                key=self.public_key,
-                algorithms=[self.algorithm],
-            )
+            with stage("jwt_verify"):
+                claims = keyring.verify(token)
         except ExpiredSignatureError:
             raise exc.TokenHasExpiredException()
-        except DecodeError:
+        except InvalidTokenError:
             raise exc.TokenDecodeException()
-        return PayloadSchema(**payload)
 
-    def create_token(self, token_type: JWTType, user: User):
-        payload = PayloadSchema(
+        return PayloadSchema(**claims)
+
+    def create_token(self, token_type: JWTType, user: User | Row):
+        payload = self.create_payload(token_type, user)
+        return self.encode_jwt(payload)
+
+    def create_payload(self, token_type: JWTType, user: User | Row) -> PayloadSchema:
+        return PayloadSchema(
             sub=str(user.id),
             email=user.email,  # type: ignore
             is_activated=user.is_activated,
             typ=token_type,
+            jti=uuid.uuid4().hex,
             **self.__generate_iat_and_exp(token_type),
         )
-        return self.encode_jwt(payload)
 
-    async def activate_user(self, payload: PayloadSchema) -> AccessTokenSchema:
-        async with helper.session_factory() as session:
-            users_service = UserAPIService(session)
-            user_id = int(payload.sub)
-            user = await users_service.get_user_by_id(user_id)
+    async def activate_user(
+        self,
+        payload: PayloadSchema,
+        schema: ConfirmCodeSchema,
+    ) -> AccessTokenSchema:
+        user_id = int(payload.sub)
+        codes = ActivationCodeStore(self.session)
+        user = await codes.redeem(user_id, schema.code)
+
+        if user is None:
+            # only the failure path pays for finding out why nothing was updated
+            is_activated = await self.session.scalar(
+                select(User.is_activated).where(User.id == user_id)
+            )
+            await self.session.rollback()
 
-            if user.is_activated:
+            if is_activated is None:
+                raise UserNotFoundException()
+            elif is_activated:
                 raise exc.UserAlreadyActivatedException()
+            raise exc.InvalidConfirmationCodeException()
 
-            user.is_activated = True
-            await session.commit()
-
-            token_schema = self.get_token_schema(user)
+        await adjust_user_counters(self.session, activated=1, not_activated=-1)
+        mark_users_changed(self.session, user.id)
+        token_schema = await self.issue_tokens(user)
+        await self.session.commit()
         return token_schema
 
-    @staticmethod
-    def __verify(password: str, hashed_password: str) -> bool:
-        return bcrypt.checkpw(
-            password=password.encode(), hashed_password=hashed_password.encode()
-        )
-
     @staticmethod
     def __generate_iat_and_exp(token_type: JWTType) -> dict[str, datetime]:
         iat = datetime.now(timezone.utc)
@@ -126,63 +181,28 @@ class AuthAPIService:
         return {"iat": iat, "exp": exp}
 
 
-class EmailService:
-    def __init__(self) -> None:
-        self.sender = settings.email.sender
-        self.env = settings.email.env
-
-    async def send_activation_code(self, payload: PayloadSchema) -> ConfirmCodeSchema:
+class EmailService(BaseAPIService):
+    async def send_activation_code(
+        self,
+        payload: PayloadSchema,
+    ) -> ActivationCodeSentSchema:
         if payload.is_activated:
             raise exc.UserAlreadyActivatedException()
 
-        recipient = str(payload.email)
-        confirmation_code = self.generate_confirmation_code()
-        await self.send_message(confirmation_code, recipient)
-        return ConfirmCodeSchema(code=confirmation_code)
-
-    async def send_message(self, confirmation_code: str, recipient: str) -> None:
-        message = self.__collect_message(confirmation_code, recipient)
-        await aiosmtplib.send(
-            message,
-            hostname=settings.email.host,
-            port=settings.email.port,
-            sender=self.sender,
-            recipients=[recipient],
-        )
-
-    def __collect_message(
-        self,
-        confirmation_code: str,
-        recipient: str,
-        subject: str = settings.email.default_subject,
-    ) -> EmailMessage:
-        message = EmailMessage()
-        message["From"] = self.sender
-        message["To"] = recipient
-        message["Subject"] = subject
-
-        message.set_content(settings.email.default_plain_text)
-        message.add_alternative(
-            self.__generate_html_content(confirmation_code), subtype="html"
-        )
+        codes = ActivationCodeStore(self.session)
+        confirmation_code, expires_at = await codes.issue(int(payload.sub))
 
-        return message
-
-    @staticmethod
-    def generate_confirmation_code() -> str:
-        return str(secrets.randbelow(900000) + 100000)
-
-    def __generate_html_content(self, confirmation_code: str):
-        template = self.env.get_template("message.html")
-        html_content = template.render(code=confirmation_code)
-        return html_content
+        recipient = str(payload.email)
+        with stage("email_enqueue"):
+            await send_activation_code_task.kiq(confirmation_code, recipient)
+        return ActivationCodeSentSchema(expires_at=expires_at)
 
 
 service_dep: type[AuthAPIService] = Annotated[
     AuthAPIService,
-    Depends(AuthAPIService),
+    Depends(AuthAPIService.get_service),
 ]
 email_service_dep: type[EmailService] = Annotated[
     EmailService,
-    Depends(EmailService),
+    Depends(EmailService.get_service),
 ]
@@ -0,0 +1,58 @@
+import time
+import hashlib
+from functools import cached_property
+from typing import Any
+
+from core import settings
+from core.cache import TTLCache
+from .schemas import PayloadSchema
+
+
+class VerifiedTokenCache:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @cached_property
+    def max_token_length(self) -> int:
+        return settings.jwt.verified_cache_max_token_length
+
+    # entries always carry their own ttl, taken from the token "exp" claim
+    @cached_property
+    def cache(self) -> TTLCache:
+        return TTLCache(max_size=settings.jwt.verified_cache_size, ttl=0)
+
+    def get(self, token: str) -> PayloadSchema | None:
+        if len(token) > self.max_token_length:
+            return None
+
+        payload = self.cache.get(self.__digest(token))
+
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload
+
+    def set(self, token: str, payload: PayloadSchema) -> None:
+        ttl = payload.exp.timestamp() - time.time()
+
+        if ttl > 0 and len(token) <= self.max_token_length:
+            self.cache.set(self.__digest(token), payload, ttl=ttl)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.cache),
+            "max_size": self.cache.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    @staticmethod
+    def __digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+verified_tokens = VerifiedTokenCache()
@@ -0,0 +1,74 @@
+from datetime import datetime
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.postgresql import insert
+
+from core import BaseAPIService
+from core.models import RefreshToken
+
+
+class RefreshTokenStore(BaseAPIService):
+    async def issue(self, user_id: int, jti: str, expires_at: datetime) -> None:
+        stmt = insert(RefreshToken).values(
+            user_id=user_id, jti=jti, expires_at=expires_at
+        )
+        await self.session.execute(stmt)
+
+    # marks a live token as used; False means it had already been used (a
+    # replay), None that it is unknown, expired or revoked
+    async def rotate(self, user_id: int, jti: str) -> bool | None:
+        stmt = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.jti == jti,
+                RefreshToken.user_id == user_id,
+                RefreshToken.used_at.is_(None),
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > func.now(),
+            )
+            .values(used_at=func.now())
+            .returning(RefreshToken.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+
+        if result.scalar_one_or_none() is not None:
+            return True
+
+        is_replayed = await self.session.scalar(
+            select(RefreshToken.id).where(
+                RefreshToken.jti == jti,
+                RefreshToken.user_id == user_id,
+                RefreshToken.used_at.is_not(None),
+                RefreshToken.revoked_at.is_(None),
+            )
+        )
+        return False if is_replayed else None
+
+    async def revoke_user(self, user_id: int) -> int:
+        stmt = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.user_id == user_id,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > func.now(),
+            )
+            .values(revoked_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
+
+    async def purge_expired(self, batch_size: int) -> int:
+        expired_ids = (
+            select(RefreshToken.id)
+            .where(RefreshToken.expires_at < func.now())
+            .order_by(RefreshToken.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = delete(RefreshToken).where(
+            RefreshToken.id.in_(expired_ids.scalar_subquery())
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount
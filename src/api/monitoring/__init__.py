@@ -0,0 +1 @@
+from .routes import router as monitoring_router, metrics_router
@@ -0,0 +1,88 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from core.models import helper
+from core.hashing import hasher
+from core.rate_limit import limiter
+from core.timing import render_prometheus
+from api.users.cache import user_cache
+from api.auth.dependencies import admin_dependency
+from api.auth.token_cache import verified_tokens
+from api.auth.revocation import revoked_tokens
+from .schemas import (
+    WorkerPoolMetricsSchema,
+    UserCacheStatsSchema,
+    TokenCacheStatsSchema,
+    DBPoolMetricsSchema,
+    RateLimitMetricsSchema,
+    TaskRunMetricsSchema,
+)
+from .task_runs import task_runs_dep
+
+
+# pool sizes, cache counters and task runs are not for anonymous clients
+admin_only = [Depends(admin_dependency)]
+router = APIRouter(prefix="/monitoring", tags=["Мониторинг"], dependencies=admin_only)
+metrics_router = APIRouter(tags=["Мониторинг"], dependencies=admin_only)
+
+
+@router.get("/hashing", response_model=dict[str, WorkerPoolMetricsSchema])
+async def handle_get_hashing_metrics():
+    return hasher.metrics()
+
+
+@router.get("/user-cache", response_model=UserCacheStatsSchema)
+async def handle_get_user_cache_stats():
+    return user_cache.stats()
+
+
+@router.get("/token-cache", response_model=TokenCacheStatsSchema)
+async def handle_get_token_cache_stats():
+    return verified_tokens.stats()
+
+
+@router.get("/db-pool", response_model=DBPoolMetricsSchema)
+async def handle_get_db_pool_metrics():
+    return helper.pool_metrics()
+
+
+@router.get("/rate-limit", response_model=dict[str, RateLimitMetricsSchema])
+async def handle_get_rate_limit_metrics():
+    return limiter.metrics()
+
+
+@router.get("/task-runs", response_model=dict[str, TaskRunMetricsSchema])
+async def handle_get_task_runs(task_runs: task_runs_dep):
+    return await task_runs.metrics()
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def handle_get_prometheus_metrics(task_runs: task_runs_dep):
+    return PlainTextResponse(
+        render_prometheus(collect_gauges(await task_runs.metrics())),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+def collect_gauges(
+    task_runs: dict[str, dict[str, Any]],
+) -> dict[str, dict[tuple[tuple[str, Any], ...], float]]:
+    gauges: dict[str, dict[tuple[tuple[str, Any], ...], float]] = {}
+
+    def add(group: str, stats: dict[str, Any], **labels: Any) -> None:
+        for key, value in stats.items():
+            if isinstance(value, (int, float)):
+                gauges.setdefault(f"{group}_{key}", {})[tuple(labels.items())] = value
+
+    for pool, stats in hasher.metrics().items():
+        add("hashing", stats, pool=pool)
+    for route, stats in limiter.metrics().items():
+        add("rate_limit", stats, route=route)
+    add("user_cache", user_cache.stats())
+    add("token_cache", verified_tokens.stats())
+    add("token_revocation", revoked_tokens.stats())
+    for task, stats in task_runs.items():
+        add("task_run", stats, task=task)
+    add("db_pool", helper.pool_metrics())
+    return gauges
@@ -0,0 +1,59 @@
+from pydantic import BaseModel
+
+
+class WorkerPoolMetricsSchema(BaseModel):
+    executor: str
+    max_workers: int
+    capacity: int
+    in_flight: int
+    submitted: int
+    completed: int
+    failed: int
+    rejected: int
+    avg_wait_ms: float
+    avg_run_ms: float
+
+
+class UserCacheStatsSchema(BaseModel):
+    size: int
+    max_size: int
+    ttl_seconds: int
+    local_hits: int
+    shared_hits: int
+    misses: int
+    invalidations: int
+    hit_ratio: float
+
+
+class TokenCacheStatsSchema(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+class DBPoolMetricsSchema(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    overflow_events: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class RateLimitMetricsSchema(BaseModel):
+    checked: int
+    rejected: int
+
+
+class TaskRunMetricsSchema(BaseModel):
+    runs: int
+    processed_total: int
+    last_processed: int
+    last_batches: int
+    last_seconds: float
+    last_finished_timestamp: float
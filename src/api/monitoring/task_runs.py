@@ -0,0 +1,57 @@
+from typing import Annotated, Any
+from fastapi import Depends
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+
+from core import BaseAPIService
+from core.models import TaskRun
+
+
+class TaskRunStore(BaseAPIService):
+    async def record(
+        self,
+        task_name: str,
+        processed: int,
+        batches: int,
+        seconds: float,
+    ) -> None:
+        stmt = insert(TaskRun).values(
+            task_name=task_name,
+            runs=1,
+            processed_total=processed,
+            last_processed=processed,
+            last_batches=batches,
+            last_seconds=seconds,
+            last_finished_at=func.now(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TaskRun.task_name],
+            set_={
+                "runs": TaskRun.runs + 1,
+                "processed_total": TaskRun.processed_total + processed,
+                "last_processed": stmt.excluded.last_processed,
+                "last_batches": stmt.excluded.last_batches,
+                "last_seconds": stmt.excluded.last_seconds,
+                "last_finished_at": stmt.excluded.last_finished_at,
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def metrics(self) -> dict[str, dict[str, Any]]:
+        result = await self.session.scalars(select(TaskRun))
+        return {
+            run.task_name: {
+                "runs": run.runs,
+                "processed_total": run.processed_total,
+                "last_processed": run.last_processed,
+                "last_batches": run.last_batches,
+                "last_seconds": run.last_seconds,
+                "last_finished_timestamp": run.last_finished_at.timestamp(),
+            }
+            for run in result
+        }
+
+
+task_runs_dep: type[TaskRunStore] = Annotated[
+    TaskRunStore, Depends(TaskRunStore.get_read_service)
+]
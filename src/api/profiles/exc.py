@@ -0,0 +1,8 @@
+from fastapi import HTTPException, status
+
+
+class ProfileNotFoundException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND, detail="profile not found"
+        )
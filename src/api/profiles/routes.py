@@ -0,0 +1,63 @@
+from typing import Annotated
+from annotated_types import Gt
+from fastapi import APIRouter, Depends, Query
+from pydantic import AfterValidator
+
+from core import settings
+from core.models import User
+from api.auth.dependencies import user_dependency
+from .schemas import (
+    GetProfileSchema,
+    UpdateProfileSchema,
+    PartialUpdateProfileSchema,
+)
+from .service import service_dep, read_service_dep
+
+
+router = APIRouter(prefix="/profiles", tags=["Профили"])
+
+int_gt_0 = Annotated[int, Gt(0)]
+user_dep = Annotated[User, Depends(user_dependency)]
+
+
+# read from the settings on validation, not at import
+def check_user_ids(user_ids: list[int]) -> list[int]:
+    if len(user_ids) > settings.pagination.max_limit:
+        raise ValueError(f"at most {settings.pagination.max_limit} ids are allowed")
+    return user_ids
+
+
+@router.get("/", response_model=list[GetProfileSchema])
+async def handle_get_profiles(
+    service: read_service_dep,
+    user_ids: Annotated[
+        list[int_gt_0],
+        Query(alias="user_id"),
+        AfterValidator(check_user_ids),
+    ],
+):
+    return await service.get_profiles(user_ids)
+
+
+@router.get("/me", response_model=GetProfileSchema)
+async def handle_get_own_profile(service: read_service_dep, user: user_dep):
+    return await service.get_profile(user.id)
+
+
+@router.put("/me", response_model=GetProfileSchema)
+async def handle_update_own_profile(
+    service: service_dep, user: user_dep, schema: UpdateProfileSchema
+):
+    return await service.update_profile(user_id=user.id, schema=schema)
+
+
+@router.patch("/me", response_model=GetProfileSchema)
+async def handle_partial_update_own_profile(
+    service: service_dep, user: user_dep, schema: PartialUpdateProfileSchema
+):
+    return await service.update_profile(user_id=user.id, schema=schema)
+
+
+@router.get("/{user_id}", response_model=GetProfileSchema)
+async def handle_get_profile(service: read_service_dep, user_id: int_gt_0):
+    return await service.get_profile(user_id)
@@ -16,3 +16,11 @@ class GetProfileSchema(BaseProfileSchema):
 
 class GetProfileWithoutUserSchema(BaseProfileSchema):
     pass
+
+
+class UpdateProfileSchema(BaseProfileSchema):
+    pass
+
+
+class PartialUpdateProfileSchema(BaseProfileSchema):
+    pass
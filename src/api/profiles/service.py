@@ -0,0 +1,96 @@
+from typing import Annotated, Sequence
+from fastapi import Depends
+from sqlalchemy import select, update, any_, bindparam, Integer, Row
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import load_only
+
+from core import BaseAPIService
+from core.models import Profile
+from .schemas import UpdateProfileSchema, PartialUpdateProfileSchema
+from . import exc
+
+
+PROFILE_COLUMNS = (
+    Profile.id,
+    Profile.user_id,
+    Profile.first_name,
+    Profile.last_name,
+    Profile.bio,
+)
+
+
+class ProfileAPIService(BaseAPIService):
+    async def get_profile(self, user_id: int) -> Profile:
+        stmt = (
+            select(Profile)
+            .options(
+                load_only(
+                    Profile.user_id,
+                    Profile.first_name,
+                    Profile.last_name,
+                    Profile.bio,
+                )
+            )
+            .where(Profile.user_id == user_id)
+        )
+        result = await self.session.execute(stmt)
+        profile = result.scalar_one_or_none()
+
+        if not profile:
+            raise exc.ProfileNotFoundException()
+        return profile
+
+    # one array parameter keeps the statement text, and so the prepared
+    # statement, the same for any number of ids
+    async def get_profiles(self, user_ids: list[int]) -> Sequence[Row]:
+        stmt = select(*PROFILE_COLUMNS).where(
+            Profile.user_id == any_(bindparam("user_ids", type_=ARRAY(Integer)))
+        )
+        result = await self.session.execute(stmt, {"user_ids": user_ids})
+        profiles = {profile.user_id: profile for profile in result.all()}
+        return [profiles[user_id] for user_id in user_ids if user_id in profiles]
+
+    async def update_profile(
+        self,
+        user_id: int,
+        schema: UpdateProfileSchema | PartialUpdateProfileSchema,
+    ) -> Row:
+        is_partial = isinstance(schema, PartialUpdateProfileSchema)
+        values = schema.model_dump(exclude_none=is_partial)
+
+        if not values:
+            return await self.__get_profile_row(user_id)
+
+        stmt = (
+            update(Profile)
+            .where(Profile.user_id == user_id)
+            .values(**values)
+            .returning(*PROFILE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        profile = result.one_or_none()
+
+        if not profile:
+            await self.session.rollback()
+            raise exc.ProfileNotFoundException()
+
+        await self.session.commit()
+        return profile
+
+    async def __get_profile_row(self, user_id: int) -> Row:
+        stmt = select(*PROFILE_COLUMNS).where(Profile.user_id == user_id)
+        result = await self.session.execute(stmt)
+        profile = result.one_or_none()
+
+        if not profile:
+            raise exc.ProfileNotFoundException()
+        return profile
+
+
+service_dep: type[ProfileAPIService] = Annotated[
+    ProfileAPIService, Depends(ProfileAPIService.get_service)
+]
+read_service_dep: type[ProfileAPIService] = Annotated[
+    ProfileAPIService, Depends(ProfileAPIService.get_read_service)
+]
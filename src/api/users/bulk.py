@@ -0,0 +1,213 @@
+from typing import Annotated, Any, AsyncIterator, Literal
+from datetime import datetime
+from fastapi import Depends
+from sqlalchemy import (
+    select,
+    update,
+    delete,
+    func,
+    any_,
+    bindparam,
+    Integer,
+    ColumnElement,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from core import BaseAPIService, settings
+from core.models import User, UserCode, helper
+from core.serialization import dump_json
+from .schemas import BulkUsersSchema, BulkProgressSchema, UsersFilterSchema
+from .filters import filter_conditions
+from .counts import adjust_user_counters
+from .cache import mark_users_changed
+from . import exc
+
+
+BulkAction = Literal["activate", "delete"]
+
+
+# one array parameter instead of an IN list: the statement text and its
+# prepared plan stay the same whatever the chunk size
+def any_id(column: Any, ids: list[int]) -> ColumnElement[bool]:
+    return column == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+
+
+class UserBulkService(BaseAPIService):
+    # every chunk is committed on its own, so row locks are held for one chunk
+    # at most and an interrupted job keeps the chunks already done
+    async def run(
+        self,
+        action: BulkAction,
+        schema: BulkUsersSchema,
+        chunk_size: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        if chunk_size is None:
+            chunk_size = settings.users_bulk.chunk_size
+
+        apply = self.activate_chunk if action == "activate" else self.delete_chunk
+        chunks = (
+            self.__split_ids(schema.ids, chunk_size)
+            if schema.ids is not None
+            else self.__select_ids(
+                action, schema.filters, chunk_size, limit=schema.confirm_count
+            )
+        )
+        processed = 0
+        affected = 0
+
+        async for number, ids in chunks:
+            chunk_affected = len(await apply(ids))
+            await self.session.commit()
+
+            processed += len(ids)
+            affected += chunk_affected
+            yield {
+                "chunk": number,
+                "processed": processed,
+                "affected": affected,
+                "chunk_affected": chunk_affected,
+            }
+
+    async def count_matches(self, action: BulkAction, schema: BulkUsersSchema) -> int:
+        if schema.ids is not None:
+            conditions = [any_id(User.id, sorted(set(schema.ids)))]
+        else:
+            conditions = filter_conditions(schema.filters)
+        if action == "activate":
+            conditions.append(User.is_activated.is_(False))
+
+        stmt = select(func.count()).select_from(User).where(*conditions)
+        return await self.session.scalar(stmt)
+
+    # a wrong filter deletes users for good, so the caller has to state how many
+    # users it matches; the run then stops after that many
+    async def check_confirmation(
+        self,
+        action: BulkAction,
+        schema: BulkUsersSchema,
+    ) -> None:
+        if action != "delete" or schema.filters is None:
+            return
+
+        matched = await self.count_matches(action, schema)
+        if schema.confirm_count != matched:
+            raise exc.BulkDeleteNotConfirmedException(matched)
+
+    async def activate_chunk(self, ids: list[int]) -> list[int]:
+        stmt = (
+            update(User)
+            .where(any_id(User.id, ids), User.is_activated.is_(False))
+            .values(is_activated=True)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        activated = list(await self.session.scalars(stmt))
+
+        if activated:
+            # pending activation codes of these users can't be redeemed anymore
+            await self.session.execute(
+                delete(UserCode).where(any_id(UserCode.user_id, activated))
+            )
+            await adjust_user_counters(
+                self.session, activated=len(activated), not_activated=-len(activated)
+            )
+            mark_users_changed(self.session, *activated)
+        return activated
+
+    # profiles, codes and refresh tokens go with the user by ON DELETE CASCADE
+    async def delete_chunk(self, ids: list[int]) -> list[int]:
+        stmt = (
+            delete(User)
+            .where(any_id(User.id, ids))
+            .returning(User.id, User.is_activated)
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await self.session.execute(stmt)).all()
+
+        if rows:
+            activated = sum(1 for _, is_activated in rows if is_activated)
+            await adjust_user_counters(
+                self.session,
+                activated=-activated,
+                not_activated=activated - len(rows),
+            )
+            mark_users_changed(self.session, *(user_id for user_id, _ in rows))
+        return [user_id for user_id, _ in rows]
+
+    # walks ix_user_created_at_not_activated oldest first; the condition must
+    # stay "NOT is_activated" for the planner to match the partial index
+    async def purge_unactivated(self, created_before: datetime, batch_size: int) -> int:
+        stmt = (
+            select(User.id)
+            .where(~User.is_activated, User.created_at < created_before)
+            .order_by(User.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        ids = list(await self.session.scalars(stmt))
+        deleted = await self.delete_chunk(ids) if ids else []
+        await self.session.commit()
+        return len(deleted)
+
+    # sorted chunks take row locks in the same order as any concurrent job
+    @staticmethod
+    async def __split_ids(
+        ids: list[int],
+        chunk_size: int,
+    ) -> AsyncIterator[tuple[int, list[int]]]:
+        ids = sorted(set(ids))
+
+        for number, start in enumerate(range(0, len(ids), chunk_size), start=1):
+            yield number, ids[start : start + chunk_size]
+
+    async def __select_ids(
+        self,
+        action: BulkAction,
+        filters: UsersFilterSchema,
+        chunk_size: int,
+        limit: int | None = None,
+    ) -> AsyncIterator[tuple[int, list[int]]]:
+        conditions = filter_conditions(filters)
+        if action == "activate":
+            conditions.append(User.is_activated.is_(False))
+
+        number = 0
+        last_id = 0
+        remaining = limit
+
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            stmt = (
+                select(User.id)
+                .where(*conditions, User.id > last_id)
+                .order_by(User.id)
+                .limit(size)
+            )
+            ids = list(await self.session.scalars(stmt))
+
+            if not ids:
+                break
+
+            number += 1
+            yield number, ids
+
+            last_id = ids[-1]
+            if remaining is not None:
+                remaining -= len(ids)
+            if len(ids) < size:
+                break
+
+
+# own session: the request-scoped one is closed before the body is streamed
+async def stream_bulk_progress(
+    action: BulkAction,
+    schema: BulkUsersSchema,
+) -> AsyncIterator[bytes]:
+    async with helper.session_factory() as session:
+        async for progress in UserBulkService(session).run(action, schema):
+            yield dump_json(BulkProgressSchema, progress) + b"\n"
+
+
+bulk_service_dep: type[UserBulkService] = Annotated[
+    UserBulkService, Depends(UserBulkService.get_service)
+]
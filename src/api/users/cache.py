@@ -0,0 +1,154 @@
+import json
+import asyncio
+import logging
+from functools import cached_property
+from typing import Any, Iterable
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core import settings
+from core.models import User
+from core.cache import TTLCache, SharedCacheBackend, create_shared_backend
+
+
+logger = logging.getLogger(__name__)
+
+CHANGED_USERS_KEY = "changed_user_ids"
+# the password hash is deliberately left out of both tiers
+CACHED_COLUMNS = ("id", "username", "email", "created_at", "is_activated")
+
+
+# both tiers are set up from the settings on first use, not at import
+class UserCache:
+    def __init__(self) -> None:
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._pending: set[asyncio.Task] = set()
+
+    @cached_property
+    def local(self) -> TTLCache:
+        return TTLCache(
+            max_size=settings.cache.user_max_size,
+            ttl=settings.cache.user_ttl_seconds,
+        )
+
+    @cached_property
+    def shared(self) -> SharedCacheBackend | None:
+        return create_shared_backend(settings.cache.shared_url)
+
+    @cached_property
+    def ttl(self) -> int:
+        return settings.cache.user_ttl_seconds
+
+    @cached_property
+    def prefix(self) -> str:
+        return f"{settings.cache.shared_key_prefix}users:"
+
+    async def get(self, user_id: int) -> User | None:
+        data = self.local.get(user_id)
+
+        if data is not None:
+            self.local_hits += 1
+            return self.__to_user(data)
+
+        if self.shared is not None:
+            raw = await self.shared.get(self.__key(user_id))
+
+            if raw is not None:
+                self.shared_hits += 1
+                data = json.loads(raw)
+                data["created_at"] = datetime.fromisoformat(data["created_at"])
+                self.local.set(user_id, data)
+                return self.__to_user(data)
+
+        self.misses += 1
+        return None
+
+    async def set(self, user: User) -> None:
+        data = {column: getattr(user, column) for column in CACHED_COLUMNS}
+        self.local.set(user.id, data)
+
+        if self.shared is not None:
+            raw = json.dumps(data, default=datetime.isoformat)
+            await self.shared.set(self.__key(user.id), raw.encode(), ex=self.ttl)
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        user_ids = list(user_ids)
+
+        for user_id in user_ids:
+            self.local.delete(user_id)
+        self.invalidations += len(user_ids)
+
+        if self.shared is not None and user_ids:
+            # called from sync ORM events, so the shared tier is cleared in background
+            keys = [self.__key(user_id) for user_id in user_ids]
+            task = asyncio.get_running_loop().create_task(self.shared.delete(*keys))
+            self._pending.add(task)
+            task.add_done_callback(self.__shared_delete_done)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            "size": len(self.local),
+            "max_size": self.local.max_size,
+            "ttl_seconds": self.ttl,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": (
+                round((lookups - self.misses) / lookups, 4) if lookups else 0.0
+            ),
+        }
+
+    # nothing awaits the background delete, so its failure is only logged; the
+    # stale entry stays in the shared tier until it expires
+    def __shared_delete_done(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "failed to invalidate users in the shared cache",
+                exc_info=task.exception(),
+            )
+
+    def __key(self, user_id: int) -> str:
+        return f"{self.prefix}{user_id}"
+
+    @staticmethod
+    def __to_user(data: dict[str, Any]) -> User:
+        return User(**data)
+
+
+def mark_users_changed(session: Session, *user_ids: int) -> None:
+    session.info.setdefault(CHANGED_USERS_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def collect_changed_users(session: Session, flush_context: Any) -> None:
+    user_ids = [
+        obj.id
+        for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    ]
+    if user_ids:
+        mark_users_changed(session, *user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_changed_users(session: Session) -> None:
+    user_ids = session.info.pop(CHANGED_USERS_KEY, None)
+
+    if user_ids:
+        user_cache.invalidate(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_changed_users(session: Session) -> None:
+    session.info.pop(CHANGED_USERS_KEY, None)
+
+
+user_cache = UserCache()
@@ -0,0 +1,117 @@
+import json
+from functools import lru_cache
+from typing import Annotated, Any
+from fastapi import Depends
+from sqlalchemy import select, func, text, ClauseElement, Executable
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+
+from core import settings, BaseAPIService
+from core.cache import TTLCache
+from core.models import User, UserCounter
+from .filters import filter_conditions
+from .schemas import UsersFilterSchema
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Executable) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element: Explain, compiler: Any, **kwargs: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kwargs)
+
+
+# runs in the caller's transaction, so the counters commit or roll back
+# together with the users they count
+async def adjust_user_counters(
+    session: AsyncSession,
+    activated: int = 0,
+    not_activated: int = 0,
+) -> None:
+    deltas = [
+        {"is_activated": is_activated, "count": delta}
+        for is_activated, delta in ((True, activated), (False, not_activated))
+        if delta
+    ]
+
+    if not deltas:
+        return
+
+    stmt = insert(UserCounter).values(deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserCounter.is_activated],
+        set_={"count": UserCounter.count + stmt.excluded.count},
+    )
+    await session.execute(stmt)
+
+
+RELTUPLES = text(
+    "SELECT greatest(reltuples, 0)::bigint FROM pg_class "
+    "WHERE oid = CAST(:table AS regclass)"
+)
+
+
+@lru_cache
+def get_counts_cache() -> TTLCache:
+    return TTLCache(
+        max_size=settings.counts.cache_size, ttl=settings.counts.cache_ttl_seconds
+    )
+
+
+class UserCountService(BaseAPIService):
+    async def count_users(self, filters: UsersFilterSchema) -> dict[str, Any]:
+        key = filters.model_dump_json()
+        result = get_counts_cache().get(key)
+
+        if result is None:
+            result = await self.__count(filters)
+            get_counts_cache().set(key, result)
+        return result
+
+    async def __count(self, filters: UsersFilterSchema) -> dict[str, Any]:
+        narrowing = filters.model_dump(
+            exclude={"is_activated", "search_mode"}, exclude_none=True
+        )
+        if not narrowing:
+            return await self.__count_from_counters(filters.is_activated)
+
+        # counting stops after the threshold, bigger sets get the planner's estimate
+        threshold = settings.counts.exact_threshold
+        matching = select(User.id).where(*filter_conditions(filters))
+        count = await self.session.scalar(
+            select(func.count()).select_from(matching.limit(threshold + 1).subquery())
+        )
+
+        if count <= threshold:
+            return {"count": count, "exact": True}
+        estimate = await self.__estimate(matching)
+        return {"count": max(estimate, count), "exact": False}
+
+    async def __count_from_counters(self, is_activated: bool | None) -> dict[str, Any]:
+        stmt = select(func.sum(UserCounter.count))
+        if is_activated is not None:
+            stmt = stmt.where(UserCounter.is_activated.is_(is_activated))
+
+        count = await self.session.scalar(stmt)
+        if count is not None:
+            return {"count": count, "exact": True}
+
+        # counters were never seeded: fall back to the statistics of the table
+        reltuples = await self.session.scalar(RELTUPLES, {"table": User.__tablename__})
+        return {"count": int(reltuples or 0), "exact": False}
+
+    async def __estimate(self, statement: Executable) -> int:
+        result = await self.session.scalar(Explain(statement))
+        plan = json.loads(result) if isinstance(result, str) else result
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+count_service_dep: type[UserCountService] = Annotated[
+    UserCountService,
+    Depends(UserCountService.get_read_service),
+]
@@ -20,3 +20,11 @@ class EmailIsBusyException(HTTPException):
             status_code=status.HTTP_409_CONFLICT,
             detail="user with this email already exists",
         )
+
+
+class BulkDeleteNotConfirmedException(HTTPException):
+    def __init__(self, matched: int) -> None:
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"filters match {matched} users, repeat with confirm_count={matched}",
+        )
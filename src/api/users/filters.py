@@ -0,0 +1,54 @@
+from sqlalchemy import func, or_, ColumnElement
+
+from core.models import User
+from .schemas import UsersFilterSchema
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# the smallest string above every string that starts with the prefix
+def prefix_upper_bound(prefix: str) -> str | None:
+    while prefix:
+        code = ord(prefix[-1]) + 1
+        if code == 0xD800:
+            # surrogates can't be encoded, the next character is U+E000
+            code = 0xE000
+        if code <= 0x10FFFF:
+            return prefix[:-1] + chr(code)
+        prefix = prefix[:-1]
+    return None
+
+
+def filter_conditions(filters: UsersFilterSchema) -> list[ColumnElement[bool]]:
+    conditions = []
+
+    if filters.search:
+        search = filters.search.lower()
+        columns = (func.lower(User.username), func.lower(User.email))
+
+        if filters.search_mode == "prefix":
+            # a range with the pattern operators stays on the text_pattern_ops
+            # indexes even in generic plans, where LIKE 'abc%' would not
+            upper = prefix_upper_bound(search)
+            matches = [
+                (
+                    column.op("~>=~")(search) & column.op("~<~")(upper)
+                    if upper is not None
+                    else column.op("~>=~")(search)
+                )
+                for column in columns
+            ]
+        else:
+            pattern = "%" + escape_like(search) + "%"
+            matches = [column.like(pattern, escape="\\") for column in columns]
+        conditions.append(or_(*matches))
+
+    if filters.is_activated is not None:
+        conditions.append(User.is_activated.is_(filters.is_activated))
+    if filters.created_from is not None:
+        conditions.append(User.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        conditions.append(User.created_at < filters.created_to)
+    return conditions
@@ -0,0 +1,238 @@
+import csv
+import json
+import codecs
+import tempfile
+from fastapi import Depends
+from typing import IO, Any, Annotated, AsyncIterator, Literal
+from datetime import datetime, timezone
+from pydantic import ValidationError
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from core import BaseAPIService, settings
+from core.models import User, Profile
+from core.hashing import hasher
+from .schemas import ImportUserSchema
+from .counts import adjust_user_counters
+
+
+ImportFormat = Literal["csv", "ndjson"]
+PROFILE_FIELDS = ("first_name", "last_name", "bio")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    tail = ""
+
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+# yields (row number, raw row); csv rows must not contain quoted line breaks
+async def iter_rows(
+    lines: AsyncIterator[str],
+    fmt: ImportFormat,
+) -> AsyncIterator[tuple[int, dict[str, Any] | None]]:
+    header: list[str] | None = None
+    row_number = 0
+
+    async for line in lines:
+        if not line.strip():
+            continue
+
+        if fmt == "csv" and header is None:
+            header = next(csv.reader([line]))
+            continue
+
+        row_number += 1
+        try:
+            if fmt == "csv":
+                row = dict(zip(header, next(csv.reader([line]))))
+            else:
+                row = json.loads(line)
+        except (ValueError, csv.Error):
+            row = None
+
+        yield row_number, row if isinstance(row, dict) else None
+
+
+class UserImporter(BaseAPIService):
+    async def import_rows(
+        self,
+        rows: AsyncIterator[tuple[int, dict[str, Any] | None]],
+        chunk_size: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        if chunk_size is None:
+            chunk_size = settings.users_import.chunk_size
+
+        chunk: list[tuple[int, ImportUserSchema]] = []
+
+        async for row_number, raw in rows:
+            try:
+                if raw is None:
+                    raise ValueError("row is not a valid object")
+                row = ImportUserSchema.model_validate(
+                    {key: None if value == "" else value for key, value in raw.items()}
+                )
+            except ValidationError as e:
+                error = "; ".join(
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                    for err in e.errors()
+                )
+                yield self.__report(row_number, "invalid", error=error)
+                continue
+            except ValueError as e:
+                yield self.__report(row_number, "invalid", error=str(e))
+                continue
+
+            chunk.append((row_number, row))
+            if len(chunk) >= chunk_size:
+                for report in await self.__import_chunk(chunk):
+                    yield report
+                chunk = []
+
+        if chunk:
+            for report in await self.__import_chunk(chunk):
+                yield report
+
+    # the report is spooled (in memory, on disk past the limit) and sent once the
+    # upload is consumed: answering while the client still uploads stalls clients
+    # and proxies that read the response only after sending the body
+    async def import_report(
+        self,
+        rows: AsyncIterator[tuple[int, dict[str, Any] | None]],
+    ) -> IO[bytes]:
+        report = tempfile.SpooledTemporaryFile(
+            max_size=settings.users_import.report_spool_bytes
+        )
+
+        try:
+            async for row_report in self.import_rows(rows):
+                report.write(json.dumps(row_report).encode() + b"\n")
+        except BaseException:
+            report.close()
+            raise
+
+        report.seek(0)
+        return report
+
+    async def __import_chunk(
+        self,
+        chunk: list[tuple[int, ImportUserSchema]],
+    ) -> list[dict[str, Any]]:
+        reports, unique = self.__drop_duplicates_in_chunk(chunk)
+
+        if not unique:
+            return reports
+
+        hashed_passwords = await hasher.hash_many([row.password for _, row in unique])
+        created_at = datetime.now(timezone.utc)
+        users_stmt = (
+            pg_insert(User)
+            .values(
+                [
+                    {
+                        "username": row.username,
+                        "email": row.email,
+                        "password": hashed_password,
+                        "is_activated": False,
+                        "created_at": created_at,
+                    }
+                    for (_, row), hashed_password in zip(unique, hashed_passwords)
+                ]
+            )
+            .on_conflict_do_nothing()
+            .returning(User.id, User.username)
+        )
+
+        try:
+            result = await self.session.execute(users_stmt)
+            created_ids = {username: user_id for user_id, username in result.all()}
+
+            if created_ids:
+                await self.session.execute(
+                    insert(Profile),
+                    [
+                        {"user_id": created_ids[row.username]}
+                        | row.model_dump(include=set(PROFILE_FIELDS))
+                        for _, row in unique
+                        if row.username in created_ids
+                    ],
+                )
+                await adjust_user_counters(self.session, not_activated=len(created_ids))
+            await self.session.commit()
+        except IntegrityError as e:
+            await self.session.rollback()
+            error = str(e.orig)
+            return reports + [
+                self.__report(row_number, "error", error=error)
+                for row_number, _ in unique
+            ]
+
+        skipped = [row.username for _, row in unique if row.username not in created_ids]
+        taken_usernames = set()
+
+        if skipped:
+            stmt = select(User.username).where(User.username.in_(skipped))
+            taken_usernames = set((await self.session.scalars(stmt)).all())
+
+        for row_number, row in unique:
+            if row.username in created_ids:
+                reports.append(
+                    self.__report(row_number, "created", id=created_ids[row.username])
+                )
+            elif row.username in taken_usernames:
+                reports.append(self.__report(row_number, "duplicate_username"))
+            else:
+                reports.append(self.__report(row_number, "duplicate_email"))
+
+        return sorted(reports, key=lambda report: report["row"])
+
+    def __drop_duplicates_in_chunk(
+        self,
+        chunk: list[tuple[int, ImportUserSchema]],
+    ) -> tuple[list[dict[str, Any]], list[tuple[int, ImportUserSchema]]]:
+        reports: list[dict[str, Any]] = []
+        unique: list[tuple[int, ImportUserSchema]] = []
+        usernames: set[str] = set()
+        emails: set[str] = set()
+
+        for row_number, row in chunk:
+            if row.username in usernames:
+                reports.append(self.__report(row_number, "duplicate_username"))
+            elif row.email in emails:
+                reports.append(self.__report(row_number, "duplicate_email"))
+            else:
+                usernames.add(row.username)
+                emails.add(row.email)
+                unique.append((row_number, row))
+
+        return reports, unique
+
+    @staticmethod
+    def __report(row_number: int, status: str, **extra: Any) -> dict[str, Any]:
+        return {"row": row_number, "status": status, **extra}
+
+
+async def iter_report(
+    report: IO[bytes],
+    chunk_size: int = 64 * 1024,
+) -> AsyncIterator[bytes]:
+    try:
+        while chunk := report.read(chunk_size):
+            yield chunk
+    finally:
+        report.close()
+
+
+importer_dep: type[UserImporter] = Annotated[
+    UserImporter, Depends(UserImporter.get_service)
+]
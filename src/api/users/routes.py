@@ -1,30 +1,62 @@
 from typing import Annotated
 from annotated_types import Gt
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
 
+from core.serialization import json_response
+from api.auth.dependencies import admin_dependency
 from .schemas import (
     GetUserSchema,
-    GetUserWithProfileSchema,
+    UsersPageSchema,
+    UsersPageQuerySchema,
+    UsersFilterSchema,
+    UsersCountSchema,
+    BulkUsersSchema,
+    BulkPreviewSchema,
     CreateUserSchema,
     UpdateUserSchema,
     PartialUpdateUserSchema,
 )
-from .service import service_dep
+from .service import service_dep, read_service_dep
+from .counts import count_service_dep
+from .importer import importer_dep, ImportFormat, iter_lines, iter_rows, iter_report
+from .bulk import BulkAction, bulk_service_dep, stream_bulk_progress
 
 
 router = APIRouter(prefix="/users", tags=["Пользователи"])
 
 int_gt_0 = Annotated[int, Gt(0)]
+admin_only = [Depends(admin_dependency)]
 
 
-@router.get("/", response_model=list[GetUserWithProfileSchema])
-async def handle_get_users(service: service_dep):
-    return await service.get_users()
+@router.get("/", response_model=UsersPageSchema)
+async def handle_get_users(
+    service: read_service_dep,
+    query: Annotated[UsersPageQuerySchema, Query()],
+):
+    page = await service.get_users(
+        limit=query.limit, cursor=query.cursor, filters=query
+    )
+    return json_response(UsersPageSchema, page)
+
+
+@router.get("/count", response_model=UsersCountSchema)
+async def handle_count_users(
+    service: count_service_dep,
+    filters: Annotated[UsersFilterSchema, Query()],
+):
+    return await service.count_users(filters)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def handle_stream_users(service: read_service_dep):
+    return StreamingResponse(service.stream_users(), media_type="application/x-ndjson")
 
 
 @router.get("/{user_id}", response_model=GetUserSchema)
-async def handle_get_user(service: service_dep, user_id: int_gt_0):
-    return await service.get_user_by_id(user_id)
+async def handle_get_user(service: read_service_dep, user_id: int_gt_0):
+    user = await service.get_user_by_id(user_id)
+    return json_response(GetUserSchema, user)
 
 
 @router.post("/", response_model=GetUserSchema, status_code=status.HTTP_201_CREATED)
@@ -32,6 +64,42 @@ async def handle_create_user(service: service_dep, schema: CreateUserSchema):
     return await service.create_user(schema)
 
 
+# one report line per row, like the cli
+@router.post("/import", response_class=StreamingResponse, dependencies=admin_only)
+async def handle_import_users(
+    importer: importer_dep,
+    request: Request,
+    fmt: Annotated[ImportFormat, Query(alias="format")] = "csv",
+):
+    rows = iter_rows(iter_lines(request.stream()), fmt)
+    report = await importer.import_report(rows)
+    return StreamingResponse(iter_report(report), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/bulk/{action}/preview",
+    response_model=BulkPreviewSchema,
+    dependencies=admin_only,
+)
+async def handle_preview_bulk_users(
+    service: bulk_service_dep, action: BulkAction, schema: BulkUsersSchema
+):
+    return {"matched": await service.count_matches(action, schema)}
+
+
+# streams one progress line per committed chunk
+@router.post(
+    "/bulk/{action}", response_class=StreamingResponse, dependencies=admin_only
+)
+async def handle_bulk_users(
+    service: bulk_service_dep, action: BulkAction, schema: BulkUsersSchema
+):
+    await service.check_confirmation(action, schema)
+    return StreamingResponse(
+        stream_bulk_progress(action, schema), media_type="application/x-ndjson"
+    )
+
+
 @router.put("/{user_id}", response_model=GetUserSchema)
 async def handle_update_user(
     service: service_dep, user_id: int_gt_0, schema: UpdateUserSchema
@@ -1,9 +1,10 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Literal
 from annotated_types import Len, Gt
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 
-from api.profiles.schemas import GetProfileWithoutUserSchema
+from core import settings
+from api.profiles.schemas import BaseProfileSchema, GetProfileWithoutUserSchema
 
 
 class BaseUserSchema(BaseModel):
@@ -21,6 +22,85 @@ class GetUserWithProfileSchema(GetUserSchema):
     profile: GetProfileWithoutUserSchema
 
 
+class UsersPageSchema(BaseModel):
+    items: list[GetUserWithProfileSchema]
+    next_cursor: str | None = None
+
+
+class UsersFilterSchema(BaseModel):
+    search: Annotated[str | None, Len(min_length=1, max_length=256)] = None
+    search_mode: Literal["prefix", "contains"] = "prefix"
+    is_activated: bool | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+
+    @model_validator(mode="after")
+    def check_search(self) -> "UsersFilterSchema":
+        # postgres text can't hold NUL
+        if self.search and "\x00" in self.search:
+            raise ValueError("search must not contain NUL characters")
+        # trigrams need at least three characters to narrow anything down
+        if self.search_mode == "contains" and self.search and len(self.search) < 3:
+            raise ValueError("substring search needs at least 3 characters")
+        return self
+
+
+# the limits are read from the settings on validation, not at import
+class UsersPageQuerySchema(UsersFilterSchema):
+    limit: Annotated[
+        int, Field(ge=1, default_factory=lambda: settings.pagination.default_limit)
+    ]
+    cursor: str | None = None
+
+    @field_validator("limit")
+    @classmethod
+    def check_limit(cls, limit: int) -> int:
+        if limit > settings.pagination.max_limit:
+            raise ValueError(f"limit must be at most {settings.pagination.max_limit}")
+        return limit
+
+
+class UsersCountSchema(BaseModel):
+    count: int
+    exact: bool
+
+
+class BulkUsersSchema(BaseModel):
+    ids: Annotated[list[Annotated[int, Gt(0)]], Len(min_length=1)] | None = None
+    filters: UsersFilterSchema | None = None
+    # filter deletes must state how many users the filter matches right now
+    confirm_count: Annotated[int, Field(ge=0)] | None = None
+
+    @field_validator("ids")
+    @classmethod
+    def check_ids(cls, ids: list[int] | None) -> list[int] | None:
+        if ids is not None and len(ids) > settings.users_bulk.max_ids:
+            raise ValueError(f"at most {settings.users_bulk.max_ids} ids are allowed")
+        return ids
+
+    @model_validator(mode="after")
+    def check_target(self) -> "BulkUsersSchema":
+        if (self.ids is None) == (self.filters is None):
+            raise ValueError("exactly one of ids and filters is required")
+        # an empty filter would match every user
+        if self.filters is not None and not self.filters.model_dump(
+            exclude_none=True, exclude={"search_mode"}
+        ):
+            raise ValueError("filters must set at least one condition")
+        return self
+
+
+class BulkPreviewSchema(BaseModel):
+    matched: int
+
+
+class BulkProgressSchema(BaseModel):
+    chunk: int
+    processed: int
+    affected: int
+    chunk_affected: int
+
+
 class CreateUserSchema(BaseUserSchema):
     password: Annotated[str, Len(min_length=8, max_length=50)]
 
@@ -29,6 +109,10 @@ class UpdateUserSchema(CreateUserSchema):
     pass
 
 
+class ImportUserSchema(CreateUserSchema, BaseProfileSchema):
+    email: Annotated[EmailStr, Len(min_length=6, max_length=256)]
+
+
 class PartialUpdateUserSchema(BaseModel):
     username: Annotated[str | None, Len(min_length=3, max_length=60)] = None
     email: EmailStr | None = None
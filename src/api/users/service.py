@@ -1,26 +1,79 @@
-import bcrypt
 from fastapi import Depends
-from typing import Sequence, Annotated
+from typing import Any, Annotated, AsyncIterator
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import IntegrityError
 
-from core import BaseAPIService
-from core.models import User, Profile
+from core import BaseAPIService, settings
+from core.exc import InvalidCursorException
+from core.models import User, Profile, helper
+from core.hashing import hasher
+from core.timing import stage
+from core.pagination import encode_cursor, decode_cursor
+from core.serialization import dump_json
 from .schemas import (
+    GetUserWithProfileSchema,
+    UsersFilterSchema,
     CreateUserSchema,
     UpdateUserSchema,
     PartialUpdateUserSchema,
 )
+from .filters import filter_conditions
+from .counts import adjust_user_counters
+from .bulk import UserBulkService
 from . import exc
 
 
 class UserAPIService(BaseAPIService):
-    async def get_users(self) -> Sequence[User]:
-        stmt = select(User).options(joinedload(User.profile)).order_by(User.id.desc())
+    async def get_users(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        filters: UsersFilterSchema | None = None,
+    ) -> dict[str, Any]:
+        stmt = (
+            select(User)
+            .options(joinedload(User.profile))
+            .order_by(User.id.desc())
+            .limit(limit + 1)
+        )
+
+        if filters is not None:
+            stmt = stmt.where(*filter_conditions(filters))
+        if cursor is not None:
+            stmt = stmt.where(User.id < self.__decode_user_cursor(cursor))
+
         result = await self.session.execute(stmt)
         users = result.scalars().all()
-        return users
+
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor(id=users[-1].id)
+        return {"items": users, "next_cursor": next_cursor}
+
+    async def stream_users(
+        self,
+        chunk_size: int | None = None,
+    ) -> AsyncIterator[bytes]:
+        if chunk_size is None:
+            chunk_size = settings.pagination.stream_chunk_size
+
+        stmt = (
+            select(User)
+            .options(joinedload(User.profile))
+            .order_by(User.id.desc())
+            .execution_options(yield_per=chunk_size)
+        )
+
+        # own session: the request-scoped one is closed before the body is streamed
+        async with helper.read_session_factory()() as session:
+            result = await session.stream(stmt)
+
+            async for users in result.scalars().partitions():
+                yield b"".join(
+                    dump_json(GetUserWithProfileSchema, user) + b"\n" for user in users
+                )
 
     async def get_user_by_id(self, user_id: int) -> User:
         stmt = select(User).where(User.id == user_id)
@@ -41,7 +94,8 @@ class UserAPIService(BaseAPIService):
         return user
 
     async def create_user(self, schema: CreateUserSchema) -> User:
-        schema.password = self.__hash_password(schema.password)
+        with stage("bcrypt"):
+            schema.password = await hasher.hash(schema.password)
         new_user = User(**schema.model_dump())
         new_profile = Profile()
 
@@ -52,6 +106,7 @@ class UserAPIService(BaseAPIService):
 
                 new_profile.user_id = new_user.id
                 self.session.add(new_profile)
+                await adjust_user_counters(self.session, not_activated=1)
 
         except IntegrityError as e:
             err_msg = str(e.orig)
@@ -71,7 +126,13 @@ class UserAPIService(BaseAPIService):
         user = await self.get_user_by_id(user_id)
         is_partial = isinstance(schema, PartialUpdateUserSchema)
 
-        for key, value in schema.model_dump(exclude_none=is_partial).items():
+        values = schema.model_dump(exclude_none=is_partial)
+
+        if "password" in values:
+            with stage("bcrypt"):
+                values["password"] = await hasher.hash(values["password"])
+
+        for key, value in values.items():
             setattr(user, key, value)
 
         try:
@@ -88,17 +149,25 @@ class UserAPIService(BaseAPIService):
         return user
 
     async def delete_user(self, user_id: int) -> None:
-        user = await self.get_user_by_id(user_id)
-        await self.session.delete(user)
+        # a single DELETE ... RETURNING instead of loading the user first
+        deleted = await UserBulkService(self.session).delete_chunk([user_id])
+
+        if not deleted:
+            raise exc.UserNotFoundException()
         await self.session.commit()
 
     @staticmethod
-    def __hash_password(password: str) -> str:
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password=password.encode(), salt=salt)
-        return hashed.decode()
+    def __decode_user_cursor(cursor: str) -> int:
+        last_id = decode_cursor(cursor, "id")["id"]
+
+        if not isinstance(last_id, int):
+            raise InvalidCursorException()
+        return last_id
 
 
 service_dep: type[UserAPIService] = Annotated[
     UserAPIService, Depends(UserAPIService.get_service)
 ]
+read_service_dep: type[UserAPIService] = Annotated[
+    UserAPIService, Depends(UserAPIService.get_read_service)
+]
@@ -0,0 +1,102 @@
+import sys
+import json
+import asyncio
+import argparse
+from pathlib import Path
+from fastapi import HTTPException
+from typing import AsyncIterator
+
+from core.models import helper
+from core.hashing import hasher
+from api.users.importer import UserImporter, iter_rows
+from api.users.bulk import UserBulkService
+from api.users.schemas import BulkUsersSchema
+
+
+async def read_lines(path: Path) -> AsyncIterator[str]:
+    with path.open(encoding="utf-8", newline="") as file:
+        for line in file:
+            yield line.rstrip("\r\n")
+
+
+async def import_users(path: Path, fmt: str) -> None:
+    async with helper.session_factory() as session:
+        importer = UserImporter(session)
+
+        async for report in importer.import_rows(iter_rows(read_lines(path), fmt)):
+            sys.stdout.write(json.dumps(report) + "\n")
+
+    await helper.dispose()
+    hasher.shutdown()
+
+
+async def bulk_users(action: str, schema: BulkUsersSchema, dry_run: bool) -> None:
+    async with helper.session_factory() as session:
+        service = UserBulkService(session)
+
+        try:
+            if dry_run:
+                matched = await service.count_matches(action, schema)
+                sys.stdout.write(json.dumps({"matched": matched}) + "\n")
+            else:
+                await service.check_confirmation(action, schema)
+                async for progress in service.run(action, schema):
+                    sys.stdout.write(json.dumps(progress) + "\n")
+        except HTTPException as e:
+            sys.exit(e.detail)
+        finally:
+            await helper.dispose()
+
+
+def read_ids(path: Path) -> list[int]:
+    with path.open(encoding="utf-8") as file:
+        return [int(line) for line in file if line.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser(
+        "import-users", help="bulk import users from csv or ndjson file"
+    )
+    import_parser.add_argument("path", type=Path)
+    import_parser.add_argument(
+        "--format", choices=("csv", "ndjson"), default=None, dest="fmt"
+    )
+
+    bulk_parser = commands.add_parser(
+        "bulk-users", help="activate or delete users by id list or filters"
+    )
+    bulk_parser.add_argument("action", choices=("activate", "delete"))
+    target = bulk_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--ids-file", type=Path, help="one user id per line")
+    target.add_argument(
+        "--filters", type=json.loads, help='e.g. {"is_activated": false}'
+    )
+    bulk_parser.add_argument(
+        "--dry-run", action="store_true", help="only count the matching users"
+    )
+    bulk_parser.add_argument(
+        "--confirm-count",
+        type=int,
+        default=None,
+        help="required to delete by filters: the count from --dry-run",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "import-users":
+        fmt = args.fmt or ("ndjson" if args.path.suffix == ".ndjson" else "csv")
+        asyncio.run(import_users(args.path, fmt))
+    elif args.command == "bulk-users":
+        schema = BulkUsersSchema(
+            ids=read_ids(args.ids_file) if args.ids_file else None,
+            filters=args.filters,
+            confirm_count=args.confirm_count,
+        )
+        asyncio.run(bulk_users(args.action, schema, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from typing import Self
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.models import session_dep
+from core.models import session_dep, read_session_dep
 
 
 class BaseAPIService:
@@ -11,3 +11,7 @@ class BaseAPIService:
     @classmethod
     def get_service(cls, session: session_dep) -> Self:
         return cls(session=session)
+
+    @classmethod
+    def get_read_service(cls, session: read_session_dep) -> Self:
+        return cls(session=session)
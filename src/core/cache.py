@@ -0,0 +1,63 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Protocol
+
+
+class TTLCache:
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        item = self._data.get(key)
+
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# subset of the redis.asyncio.Redis API used by the shared cache tier
+class SharedCacheBackend(Protocol):
+    async def get(self, name: str) -> bytes | None: ...
+
+    async def set(self, name: str, value: bytes, ex: int | None = None) -> Any: ...
+
+    async def delete(self, *names: str) -> Any: ...
+
+
+def create_shared_backend(url: str | None) -> SharedCacheBackend | None:
+    if url is None:
+        return None
+
+    try:
+        from redis import asyncio as redis
+    except ImportError as e:
+        raise RuntimeError(
+            "'redis' package is required when a shared cache url is configured"
+        ) from e
+    return redis.from_url(url)
@@ -1,71 +1,289 @@
+import os
+from functools import lru_cache
+from typing import Any, Literal
 from pathlib import Path
 
-from jinja2 import FileSystemLoader, Environment
-from pydantic import BaseModel
+from pydantic import BaseModel, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 BASE_DIR = Path(__file__).parent.parent
 
 
+class ReplicaSettings(BaseModel):
+    HOST: str
+    PORT: int = 5432
+
+
 class DBSettings(BaseModel):
     HOST: str
     PORT: int
     USER: str
     PASS: str
     NAME: str
-    echo: bool = True
+    echo: bool = False
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    # asyncpg statement cache per connection; set both to 0 behind pgbouncer
+    statement_cache_size: int = 100
+    prepared_statement_cache_size: int = 100
+    unique_prepared_statement_names: bool = False
+    replicas: list[ReplicaSettings] = []
+    replica_retry_after_seconds: float = 30
+    read_your_writes_seconds: float = 5
+    # signs the read-your-writes cookie; derived from the database url if unset
+    read_your_writes_secret: SecretStr | None = None
 
     @property
     def url(self) -> str:
+        return self.__build_url(self.HOST, self.PORT)
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return [
+            self.__build_url(replica.HOST, replica.PORT) for replica in self.replicas
+        ]
+
+    def __build_url(self, host: str, port: int) -> str:
         return (
             f"postgresql+asyncpg://"
             f"{self.USER}:{self.PASS}@"
-            f"{self.HOST}:{self.PORT}/"
+            f"{host}:{port}/"
             f"{self.NAME}"
         )
 
 
 class ServerSettings(BaseModel):
     app: str = "main:app"
-    reload: bool = True
+    reload: bool = False
     host: str = "localhost"
     port: int = 8000
+    # ignored by uvicorn when reload is on. More than one worker needs
+    # CACHE__SHARED_URL (and RATE_LIMIT__SHARED_URL when rate limiting is on):
+    # revocation cutoffs, user cache entries and rate limit counters are
+    # otherwise kept per process
+    workers: int = 1
+    # "auto" picks uvloop and httptools when they are installed
+    loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+    http: Literal["auto", "h11", "httptools"] = "auto"
+    backlog: int = 2048
+    limit_concurrency: int | None = None
+    timeout_keep_alive: int = 5
+    # in-flight requests get this long to finish after SIGTERM before the
+    # lifespan shutdown closes the pools
+    timeout_graceful_shutdown: int | None = 30
+
+
+class PaginationSettings(BaseModel):
+    default_limit: int = 50
+    max_limit: int = 500
+    stream_chunk_size: int = 1000
+
+
+class JWTKeySettings(BaseModel):
+    kid: str
+    algorithm: Literal["RS256", "ES256", "EdDSA"] = "RS256"
+    public_key_path: Path
+    # keys without a private part are only used to verify tokens (rotated out)
+    private_key_path: Path | None = None
 
 
 class JWTSettings(BaseModel):
-    public_key: str = (BASE_DIR / "certs" / "jwt-public.pem").read_text()
-    private_key: str = (BASE_DIR / "certs" / "jwt-private.pem").read_text()
-    algorithm: str = "RS256"
+    keys: list[JWTKeySettings] = [
+        JWTKeySettings(
+            kid="default",
+            public_key_path=BASE_DIR / "certs" / "jwt-public.pem",
+            private_key_path=BASE_DIR / "certs" / "jwt-private.pem",
+        )
+    ]
+    active_kid: str = "default"
     access_token_expire_minutes: int = 10
     refresh_token_expire_days: int = 30
+    verified_cache_size: int = 50_000
+    verified_cache_max_token_length: int = 2048
+    revocation_cache_size: int = 100_000
+    # how long a process trusts its copy of a shared revocation cutoff
+    revocation_sync_seconds: float = 1
+    refresh_purge_cron: str = "0 * * * *"
+    refresh_purge_batch_size: int = 1000
 
 
-class EmailSettings(BaseSettings):
+class ActivationCodeSettings(BaseModel):
+    ttl_minutes: int = 15
+    purge_cron: str = "*/5 * * * *"
+    purge_batch_size: int = 1000
+
+
+class EmailSettings(BaseModel):
     sender: str = "admin@admin.com"
     host: str = "localhost"
     port: int = 1025
-    env: Environment = Environment(loader=FileSystemLoader(BASE_DIR / "templates"))
+    username: str | None = None
+    password: str | None = None
+    start_tls: bool | None = None
+    timeout_seconds: float = 10
+    pool_size: int = 4
+    idle_timeout_seconds: float = 30
+    health_check_after_seconds: float = 5
+    templates_dir: Path = BASE_DIR / "templates"
+    template_name: str = "message.html"
+    bytecode_cache_dir: Path | None = None
 
     default_subject: str = "Активируйте ваш аккаунт"
     default_plain_text: str = "Ваш почтовый клиент не поддерживает HTML"
 
 
+class HashingSettings(BaseModel):
+    executor: Literal["thread", "process"] = "thread"
+    max_workers: int = os.cpu_count() or 1
+    max_queue_size: int = 64
+    retry_after_seconds: int = 1
+    rounds: int = 12
+    bulk_executor: Literal["thread", "process"] = "process"
+    bulk_max_workers: int = os.cpu_count() or 1
+
+
+class CountSettings(BaseModel):
+    # filtered counts above this are estimated from the query plan
+    exact_threshold: int = 10_000
+    cache_size: int = 1024
+    cache_ttl_seconds: float = 10
+
+
+class UsersImportSettings(BaseModel):
+    chunk_size: int = 1000
+    report_spool_bytes: int = 1024 * 1024
+
+
+class UsersBulkSettings(BaseModel):
+    chunk_size: int = 1000
+    max_ids: int = 100_000
+
+
+class AdminSettings(BaseModel):
+    # admin endpoints answer 403 while no key is configured
+    api_key: SecretStr | None = None
+
+
+class StaleUsersSettings(BaseModel):
+    max_age_days: int = 30
+    purge_cron: str = "15 3 * * *"
+    purge_batch_size: int = 1000
+
+
+class CacheSettings(BaseModel):
+    user_max_size: int = 10_000
+    user_ttl_seconds: int = 30
+    shared_url: str | None = None
+    shared_key_prefix: str = "conf-acc:"
+
+
+class RateLimitRuleSettings(BaseModel):
+    key: Literal["ip", "user", "email", "username"]
+    algorithm: Literal["token_bucket", "sliding_window"] = "sliding_window"
+    limit: int
+    period_seconds: float
+
+
+class RateLimitSettings(BaseModel):
+    enabled: bool = True
+    shared_url: str | None = None
+    max_keys: int = 100_000
+    routes: dict[str, list[RateLimitRuleSettings]] = {
+        "login": [
+            RateLimitRuleSettings(
+                key="ip", algorithm="token_bucket", limit=20, period_seconds=60
+            ),
+            RateLimitRuleSettings(key="username", limit=10, period_seconds=300),
+        ],
+        "activation_code": [
+            RateLimitRuleSettings(key="user", limit=3, period_seconds=600),
+            RateLimitRuleSettings(key="email", limit=5, period_seconds=3600),
+        ],
+        "activate": [
+            RateLimitRuleSettings(key="user", limit=10, period_seconds=600),
+        ],
+    }
+
+
+class TimingSettings(BaseModel):
+    enabled: bool = True
+    sample_rate: float = 0.01
+    server_timing_header: bool = True
+    buckets: list[float] = [
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+    ]
+
+
 class RabbitMqSettings(BaseModel):
     USER: str
     PASS: str
+    HOST: str = "localhost"
+    PORT: int = 5672
+
+    @property
+    def url(self) -> str:
+        return f"amqp://{self.USER}:{self.PASS}@{self.HOST}:{self.PORT}/"
+
+
+class TaskiqSettings(BaseModel):
+    broker: Literal["rabbitmq", "inmemory"] = "rabbitmq"
+    queue_name: str = "taskiq"
+    dead_letter_queue_name: str = "taskiq.dead_letter"
+    max_retries: int = 5
+    retry_delay_seconds: float = 2
+    max_retry_delay_seconds: float = 60
 
 
 class Settings(BaseSettings):
     db: DBSettings
     server: ServerSettings = ServerSettings()
+    pagination: PaginationSettings = PaginationSettings()
+    users_import: UsersImportSettings = UsersImportSettings()
+    users_bulk: UsersBulkSettings = UsersBulkSettings()
+    stale_users: StaleUsersSettings = StaleUsersSettings()
+    admin: AdminSettings = AdminSettings()
+    counts: CountSettings = CountSettings()
     jwt: JWTSettings = JWTSettings()
     email: EmailSettings = EmailSettings()
+    codes: ActivationCodeSettings = ActivationCodeSettings()
+    hashing: HashingSettings = HashingSettings()
+    cache: CacheSettings = CacheSettings()
+    rate_limit: RateLimitSettings = RateLimitSettings()
+    timing: TimingSettings = TimingSettings()
     rabbitmq: RabbitMqSettings
+    taskiq: TaskiqSettings = TaskiqSettings()
 
     model_config = SettingsConfigDict(
         env_file=".env", case_sensitive=False, env_nested_delimiter="__"
     )
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+
+# settings are read from the environment on first attribute access, so importing
+# modules that only reference them (alembic, cli tools) stays cheap and does not
+# fail on a missing .env; get_settings.cache_clear() reloads them
+class LazySettings:
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+
+settings: Settings = LazySettings()  # type: ignore[assignment]
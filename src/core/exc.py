@@ -0,0 +1,27 @@
+from fastapi import HTTPException, status
+
+
+class ServiceOverloadedException(HTTPException):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="service is overloaded, try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class RateLimitExceededException(HTTPException):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="too many requests",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="invalid pagination cursor",
+        )
@@ -0,0 +1,180 @@
+import time
+import asyncio
+import bcrypt
+from functools import cached_property
+from typing import Callable, Any
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+from core import settings
+from .exc import ServiceOverloadedException
+
+
+def hash_password(password: str, rounds: int) -> str:
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(password=password.encode(), salt=salt).decode()
+
+
+def hash_passwords(passwords: list[str], rounds: int) -> list[str]:
+    return [hash_password(password, rounds) for password in passwords]
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(
+        password=password.encode(), hashed_password=hashed_password.encode()
+    )
+
+
+# calls beyond `max_workers + max_queue_size` are rejected with 503
+# instead of piling up behind the ones already waiting
+class WorkerPool:
+    def __init__(
+        self,
+        name: str,
+        executor: str,
+        max_workers: int,
+        max_queue_size: int,
+        retry_after: int,
+    ) -> None:
+        self.name = name
+        self.executor_type = executor
+        self.max_workers = max_workers
+        self.capacity = max_workers + max_queue_size
+        self.retry_after = retry_after
+        self._executor: Executor | None = None
+
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        # created on first use so that process pools are forked per uvicorn worker
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=f"{self.name}-pool",
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise ServiceOverloadedException(self.retry_after)
+
+        self.in_flight += 1
+        self.submitted += 1
+        queued_at = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        try:
+            result, run_seconds = await loop.run_in_executor(
+                self.executor, _timed_call, func, *args
+            )
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+        self.completed += 1
+        self.total_run_seconds += run_seconds
+        self.total_wait_seconds += time.perf_counter() - queued_at - run_seconds
+        return result
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": self.__avg_ms(self.total_wait_seconds),
+            "avg_run_ms": self.__avg_ms(self.total_run_seconds),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __avg_ms(self, total_seconds: float) -> float:
+        if not self.completed:
+            return 0.0
+        return round(total_seconds / self.completed * 1000, 3)
+
+
+def _timed_call(func: Callable[..., Any], *args: Any) -> tuple[Any, float]:
+    started_at = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started_at
+
+
+# settings are read and the pools are set up on first use, not at import
+class PasswordHasher:
+    @cached_property
+    def rounds(self) -> int:
+        return settings.hashing.rounds
+
+    @cached_property
+    def pools(self) -> dict[str, WorkerPool]:
+        # separate pools so a login storm cannot starve sign-ups and vice versa
+        pools = {
+            name: WorkerPool(
+                name=name,
+                executor=settings.hashing.executor,
+                max_workers=settings.hashing.max_workers,
+                max_queue_size=settings.hashing.max_queue_size,
+                retry_after=settings.hashing.retry_after_seconds,
+            )
+            for name in ("hash", "verify")
+        }
+        # bulk imports get their own pool so they never shed interactive requests
+        pools["bulk"] = WorkerPool(
+            name="bulk",
+            executor=settings.hashing.bulk_executor,
+            max_workers=settings.hashing.bulk_max_workers,
+            max_queue_size=settings.hashing.bulk_max_workers,
+            retry_after=settings.hashing.retry_after_seconds,
+        )
+        return pools
+
+    async def hash(self, password: str) -> str:
+        return await self.pools["hash"].run(hash_password, password, self.rounds)
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        pool = self.pools["bulk"]
+        # one slice per worker keeps executor round-trips (and pickling) low
+        size = -(-len(passwords) // pool.max_workers) or 1
+        batches = await asyncio.gather(
+            *(
+                pool.run(hash_passwords, passwords[idx : idx + size], self.rounds)
+                for idx in range(0, len(passwords), size)
+            )
+        )
+        return [hashed for batch in batches for hashed in batch]
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self.pools["verify"].run(
+            verify_password, password, hashed_password
+        )
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        return {name: pool.metrics() for name, pool in self.pools.items()}
+
+    def shutdown(self) -> None:
+        # pools that were never used have nothing to shut down
+        for pool in self.__dict__.get("pools", {}).values():
+            pool.shutdown()
+
+
+hasher = PasswordHasher()
@@ -0,0 +1,334 @@
+import time
+import asyncio
+import binascii
+from collections import deque
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from email.policy import SMTP as SMTP_POLICY
+from functools import cached_property
+from typing import TYPE_CHECKING, AsyncIterator, Iterable
+from aiosmtplib import SMTP, SMTPException, SMTPServerDisconnected
+
+from core import settings
+
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
+
+
+class SMTPPool:
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        size: int,
+        idle_timeout: float,
+        health_check_after: float,
+    ) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self._idle: deque[tuple[SMTP, float]] = deque()
+        self._semaphore = asyncio.Semaphore(size)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[SMTP]:
+        async with self._semaphore:
+            client = await self.__acquire()
+
+            try:
+                yield client
+            except (SMTPServerDisconnected, OSError):
+                client.close()
+                raise
+            except BaseException:
+                await self.__release(client)
+                raise
+            else:
+                await self.__release(client)
+
+    async def close(self) -> None:
+        while self._idle:
+            client, _ = self._idle.pop()
+            await self.__quit(client)
+
+    async def __acquire(self) -> SMTP:
+        while self._idle:
+            # most recently used first: it is the least likely to be timed out
+            client, last_used_at = self._idle.pop()
+            idle_for = time.monotonic() - last_used_at
+
+            if idle_for > self.idle_timeout or not client.is_connected:
+                await self.__quit(client)
+                continue
+
+            if idle_for > self.health_check_after:
+                try:
+                    await client.noop()
+                except (SMTPException, OSError):
+                    client.close()
+                    continue
+            return client
+
+        return await self.__connect()
+
+    async def __release(self, client: SMTP) -> None:
+        if client.is_connected:
+            self._idle.append((client, time.monotonic()))
+
+    async def __connect(self) -> SMTP:
+        client = SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=settings.email.username,
+            password=settings.email.password,
+            start_tls=settings.email.start_tls,
+            timeout=settings.email.timeout_seconds,
+        )
+        await client.connect()
+        return client
+
+    @staticmethod
+    async def __quit(client: SMTP) -> None:
+        try:
+            await client.quit()
+        except (SMTPException, OSError):
+            client.close()
+
+
+# base64 encodes 57 input bytes per 76 character line
+BASE64_LINE_BYTES = 57
+
+
+def encode_base64_lines(data: bytes) -> bytes:
+    return b"".join(
+        binascii.b2a_base64(data[i : i + BASE64_LINE_BYTES], newline=False) + b"\r\n"
+        for i in range(0, len(data), BASE64_LINE_BYTES)
+    )
+
+
+def create_template_env() -> "Environment":
+    # jinja is only needed by processes that actually send mail
+    from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+
+    bytecode_cache = None
+    if settings.email.bytecode_cache_dir is not None:
+        settings.email.bytecode_cache_dir.mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(settings.email.bytecode_cache_dir))
+
+    return Environment(
+        loader=FileSystemLoader(settings.email.templates_dir),
+        bytecode_cache=bytecode_cache,
+    )
+
+
+class MessageRenderer:
+    CODE_PLACEHOLDER = "__confirmation_code__"
+    RECIPIENT_PLACEHOLDER = "recipient@placeholder.invalid"
+    BODY_PLACEHOLDER = "__html_body__"
+
+    # the template is rendered once with a placeholder code and the whole message
+    # is serialized around it, so a send only joins the cached bytes with the
+    # recipient and the base64 lines the code falls into
+    def __init__(
+        self,
+        template: "Template",
+        sender: str,
+        subject: str,
+        plain_text: str,
+    ) -> None:
+        self.template = template
+        self.sender = sender
+        self.subject = subject
+        self.plain_text = plain_text
+
+        html = template.render(code=self.CODE_PLACEHOLDER).encode()
+        self.html_prefix, _, self.html_suffix = html.partition(
+            self.CODE_PLACEHOLDER.encode()
+        )
+        self.precompiled = html.count(self.CODE_PLACEHOLDER.encode()) == 1
+        self._encoded_html: dict[int, tuple[bytes, int, int, bytes]] = {}
+
+        # the html part is serialized with a placeholder body, its base64 lines
+        # are joined in per message
+        message = self.__collect_message(self.RECIPIENT_PLACEHOLDER, "")
+        message.get_payload()[1].set_payload(self.BODY_PLACEHOLDER)
+        raw = message.as_bytes(policy=SMTP_POLICY)
+
+        self.head, _, rest = raw.partition(self.RECIPIENT_PLACEHOLDER.encode())
+        self.middle, _, self.tail = rest.partition(
+            self.BODY_PLACEHOLDER.encode() + b"\r\n"
+        )
+
+    # non ascii recipients are left to the email package and sent with SMTPUTF8
+    def render(self, confirmation_code: str, recipient: str) -> bytes | EmailMessage:
+        if not self.precompiled or not self.__is_plain_address(recipient):
+            return self.__collect_message(
+                recipient, self.template.render(code=confirmation_code)
+            )
+
+        return b"".join(
+            (
+                self.head,
+                recipient.encode(),
+                self.middle,
+                self.__encode_html(confirmation_code.encode()),
+                self.tail,
+            )
+        )
+
+    def __encode_html(self, code: bytes) -> bytes:
+        parts = self._encoded_html.get(len(code))
+        if parts is None:
+            parts = self._encoded_html[len(code)] = self.__split_html(len(code))
+
+        head, start, end, tail = parts
+        code_end = len(self.html_prefix) + len(code)
+        middle = self.html_prefix[start:] + code + self.html_suffix[: end - code_end]
+        return head + encode_base64_lines(middle) + tail
+
+    # only the base64 lines overlapping the code change between messages, the
+    # ones before and after it are encoded once per code length
+    def __split_html(self, code_length: int) -> tuple[bytes, int, int, bytes]:
+        code_start = len(self.html_prefix)
+        code_end = code_start + code_length
+        size = code_end + len(self.html_suffix)
+
+        start = code_start - code_start % BASE64_LINE_BYTES
+        end = min(size, -(-code_end // BASE64_LINE_BYTES) * BASE64_LINE_BYTES)
+
+        html = self.html_prefix + b"0" * code_length + self.html_suffix
+        return (
+            encode_base64_lines(html[:start]),
+            start,
+            end,
+            encode_base64_lines(html[end:]),
+        )
+
+    @staticmethod
+    def __is_plain_address(recipient: str) -> bool:
+        return recipient.isascii() and not any(c in recipient for c in "\r\n,<>")
+
+    def __collect_message(self, recipient: str, html_content: str) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient
+        message["Subject"] = self.subject
+
+        message.set_content(self.plain_text, cte="base64")
+        message.add_alternative(html_content, subtype="html", cte="base64")
+
+        return message
+
+
+def create_renderer() -> MessageRenderer:
+    return MessageRenderer(
+        template=create_template_env().get_template(settings.email.template_name),
+        sender=settings.email.sender,
+        subject=settings.email.default_subject,
+        plain_text=settings.email.default_plain_text,
+    )
+
+
+def create_smtp_pool() -> SMTPPool:
+    return SMTPPool(
+        hostname=settings.email.host,
+        port=settings.email.port,
+        size=settings.email.pool_size,
+        idle_timeout=settings.email.idle_timeout_seconds,
+        health_check_after=settings.email.health_check_after_seconds,
+    )
+
+
+# the pool and the renderer are created from the settings on first use
+class Mailer:
+    @cached_property
+    def pool(self) -> SMTPPool:
+        return create_smtp_pool()
+
+    @cached_property
+    def sender(self) -> str:
+        return settings.email.sender
+
+    # compiled on first use, the task worker warms it up on startup
+    @cached_property
+    def renderer(self) -> MessageRenderer:
+        return create_renderer()
+
+    async def send_message(self, confirmation_code: str, recipient: str) -> None:
+        message = self.renderer.render(confirmation_code, recipient)
+
+        try:
+            await self.__send(message, recipient)
+        except SMTPServerDisconnected:
+            # the pooled connection was dropped by the server, retry on a fresh one
+            await self.__send(message, recipient)
+
+    # sends (confirmation_code, recipient) pairs over the pooled connections,
+    # many messages per connection, and returns recipients that were not delivered
+    async def send_many(self, messages: Iterable[tuple[str, str]]) -> list[str]:
+        queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        for item in messages:
+            queue.put_nowait(item)
+
+        failed: list[str] = []
+        workers = min(self.pool.size, queue.qsize())
+        await asyncio.gather(*(self.__drain(queue, failed) for _ in range(workers)))
+        return failed
+
+    async def __drain(
+        self,
+        queue: asyncio.Queue[tuple[str, str]],
+        failed: list[str],
+        max_reconnects: int = 2,
+    ) -> None:
+        reconnects = 0
+
+        while not queue.empty():
+            try:
+                async with self.pool.connection() as client:
+                    while not queue.empty():
+                        confirmation_code, recipient = queue.get_nowait()
+                        message = self.renderer.render(confirmation_code, recipient)
+
+                        try:
+                            await self.__deliver(client, message, recipient)
+                        except SMTPServerDisconnected:
+                            queue.put_nowait((confirmation_code, recipient))
+                            raise
+                        except SMTPException:
+                            failed.append(recipient)
+
+                        reconnects = 0
+            except (SMTPServerDisconnected, OSError):
+                reconnects += 1
+
+                if reconnects > max_reconnects:
+                    while not queue.empty():
+                        failed.append(queue.get_nowait()[1])
+
+    async def __send(self, message: bytes | EmailMessage, recipient: str) -> None:
+        async with self.pool.connection() as client:
+            await self.__deliver(client, message, recipient)
+
+    async def __deliver(
+        self,
+        client: SMTP,
+        message: bytes | EmailMessage,
+        recipient: str,
+    ) -> None:
+        if isinstance(message, EmailMessage):
+            await client.send_message(
+                message, sender=self.sender, recipients=[recipient]
+            )
+        else:
+            await client.sendmail(self.sender, [recipient], message)
+
+    async def close(self) -> None:
+        # a pool that was never used has no connections to close
+        if "pool" in self.__dict__:
+            await self.pool.close()
+
+
+mailer = Mailer()
@@ -2,13 +2,20 @@ __all__ = [
     "Base",
     "helper",
     "session_dep",
+    "read_session_dep",
     "User",
     "Profile",
     "UserCode",
+    "UserCounter",
+    "RefreshToken",
+    "TaskRun",
 ]
 
 from .base import Base
-from .db_helper import helper, session_dep
+from .db_helper import helper, session_dep, read_session_dep
 from .users import User
 from .profiles import Profile
 from .users_codes import UserCode
+from .users_counters import UserCounter
+from .refresh_tokens import RefreshToken
+from .tasks_runs import TaskRun
@@ -1,30 +1,205 @@
+import time
+from uuid import uuid4
+from itertools import cycle
 from fastapi import Depends
-from typing import AsyncGenerator, Annotated
+from typing import Any, AsyncGenerator, Annotated
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.engine import Engine, ExceptionContext
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     create_async_engine,
     async_sessionmaker,
 )
 
 from core import settings
+from core.timing import current_timing, record_stage
+from core.read_your_writes import current_read_your_writes
+from .pool import InstrumentedQueuePool
+
+
+QUERY_STARTED_AT_KEY = "query_started_at"
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine, retry_after: float) -> None:
+        self.engine = engine
+        self.session_factory = create_session_factory(engine)
+        self.retry_after = retry_after
+        self.unhealthy_until = 0.0
+        event.listen(engine.sync_engine, "handle_error", self.__on_error)
+
+    @property
+    def is_healthy(self) -> bool:
+        return self.unhealthy_until <= time.monotonic()
+
+    def __on_error(self, context: ExceptionContext) -> None:
+        # connect failures come without a connection, dropped ones as disconnects
+        if context.is_disconnect or context.connection is None:
+            self.unhealthy_until = time.monotonic() + self.retry_after
 
 
 class DBHelper:
-    def __init__(self) -> None:
-        self.engine = create_async_engine(url=settings.db.url, echo=settings.db.echo)
-        self.session_factory = async_sessionmaker(
-            bind=self.engine,
-            autoflush=False,
-            autocommit=False,
-            expire_on_commit=False,
-        )
+    # urls default to the settings, which are read on connect
+    def __init__(
+        self,
+        url: str | None = None,
+        replica_urls: list[str] | None = None,
+    ) -> None:
+        self.url = url
+        self.replica_urls = replica_urls
+        self._engine: AsyncEngine | None = None
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self.replicas: list[Replica] = []
+        self._replicas_cycle = cycle(self.replicas)
+
+    # engines are created on first use (or by the app lifespan), so importing the
+    # app opens nothing and every server worker gets its own pools
+    def connect(self) -> None:
+        if self._engine is not None:
+            return
+
+        replica_urls = self.replica_urls
+        if replica_urls is None:
+            replica_urls = settings.db.replica_urls
+
+        self._engine = self.__create_engine(self.url or settings.db.url)
+        self._session_factory = create_session_factory(self._engine)
+        self.replicas = [
+            Replica(
+                self.__create_engine(replica_url),
+                retry_after=settings.db.replica_retry_after_seconds,
+            )
+            for replica_url in replica_urls
+        ]
+        self._replicas_cycle = cycle(self.replicas)
+
+    @property
+    def engine(self) -> AsyncEngine:
+        self.connect()
+        return self._engine
+
+    @property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        self.connect()
+        return self._session_factory
+
+    def read_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        self.connect()
+        read_your_writes = current_read_your_writes.get()
+
+        if read_your_writes is not None and read_your_writes.pinned:
+            return self.session_factory
+
+        for _ in range(len(self.replicas)):
+            replica = next(self._replicas_cycle)
+
+            if replica.is_healthy:
+                return replica.session_factory
+        return self.session_factory
+
+    def pool_metrics(self) -> dict[str, Any]:
+        return self.engine.pool.metrics()
+
+    async def dispose(self) -> None:
+        if self._engine is None:
+            return
+
+        await self._engine.dispose()
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+        self._engine = None
+        self._session_factory = None
+        self.replicas = []
+        self._replicas_cycle = cycle(self.replicas)
 
     async def session_dependency(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
             yield session
 
+    async def read_session_dependency(self) -> AsyncGenerator[AsyncSession, None]:
+        async with self.read_session_factory()() as session:
+            yield session
+
+    def __create_engine(self, url: str) -> AsyncEngine:
+        return create_async_engine(
+            url=url,
+            echo=settings.db.echo,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.db.pool_size,
+            max_overflow=settings.db.max_overflow,
+            pool_timeout=settings.db.pool_timeout,
+            pool_recycle=settings.db.pool_recycle,
+            pool_pre_ping=settings.db.pool_pre_ping,
+            connect_args=self.__connect_args(url),
+        )
+
+    @staticmethod
+    def __connect_args(url: str) -> dict[str, Any]:
+        if not url.startswith("postgresql+asyncpg"):
+            return {}
+
+        connect_args = {
+            "statement_cache_size": settings.db.statement_cache_size,
+            "prepared_statement_cache_size": settings.db.prepared_statement_cache_size,
+        }
+
+        if settings.db.unique_prepared_statement_names:
+            connect_args["prepared_statement_name_func"] = (
+                lambda: f"__asyncpg_{uuid4()}__"
+            )
+        return connect_args
+
+
+def create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=engine,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+    )
+
+
+# reads that follow a commit from the same client go to the primary for a while,
+# so that they see their own writes regardless of replication lag
+@event.listens_for(Session, "after_commit")
+def pin_client_to_primary(session: Session) -> None:
+    read_your_writes = current_read_your_writes.get()
+
+    if read_your_writes is not None:
+        read_your_writes.pinned = True
+        read_your_writes.committed = True
+
+
+# query time of sampled requests shows up as the "db" stage
+@event.listens_for(Engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if current_timing.get() is not None:
+        conn.info.setdefault(QUERY_STARTED_AT_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    started_at = conn.info.get(QUERY_STARTED_AT_KEY)
+
+    if started_at:
+        record_stage("db", time.perf_counter() - started_at.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def drop_query_timer(context: ExceptionContext) -> None:
+    if context.connection is not None:
+        started_at = context.connection.info.get(QUERY_STARTED_AT_KEY)
+        if started_at:
+            started_at.pop()
+
 
 helper = DBHelper()
 session_dep: type[AsyncSession] = Annotated[
     AsyncSession, Depends(helper.session_dependency)
 ]
+read_session_dep: type[AsyncSession] = Annotated[
+    AsyncSession, Depends(helper.read_session_dependency)
+]
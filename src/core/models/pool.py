@@ -0,0 +1,63 @@
+import time
+from typing import Any
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.overflow_events = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self) -> PoolProxiedConnection:
+        started_at = time.perf_counter()
+
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+
+        wait = time.perf_counter() - started_at
+        self.stats.checkouts += 1
+        self.stats.total_wait_seconds += wait
+        self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, wait)
+        return connection
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _inc_overflow(self) -> bool:
+        incremented = super()._inc_overflow()
+
+        # overflow counts from -pool_size, positive values are connections beyond it
+        if incremented and self._overflow > 0:
+            self.stats.overflow_events += 1
+        return incremented
+
+    def metrics(self) -> dict[str, Any]:
+        checkouts = self.stats.checkouts
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": checkouts,
+            "timeouts": self.stats.timeouts,
+            "overflow_events": self.stats.overflow_events,
+            "avg_wait_ms": round(
+                self.stats.total_wait_seconds / checkouts * 1000 if checkouts else 0, 3
+            ),
+            "max_wait_ms": round(self.stats.max_wait_seconds * 1000, 3),
+        }
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey, CheckConstraint
+from sqlalchemy import String, ForeignKey, CheckConstraint, Index
 
 from .base import Base
 
@@ -31,4 +31,6 @@ class Profile(Base):
             "LENGTH(bio) >= 1",
             name="ck_profile_bio_len_ge_1",
         ),
+        # ON DELETE CASCADE looks profiles up by user_id for every deleted user
+        Index("ix_profile_user_id", "user_id"),
     )
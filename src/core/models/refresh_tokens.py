@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import ForeignKey, String, UniqueConstraint, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    jti: Mapped[str] = mapped_column(String(32))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    # set when the token is swapped for a new pair
+    used_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = (
+        UniqueConstraint("jti", name="uq_refresh_token_jti"),
+        Index("ix_refresh_token_user_id", "user_id"),
+        Index("ix_refresh_token_expires_at", "expires_at"),
+    )
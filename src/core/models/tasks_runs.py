@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, DateTime, Float, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+# one row per periodic task, written by the worker at the end of every run so
+# the app processes can report it
+class TaskRun(Base):
+    task_name: Mapped[str] = mapped_column(String(128))
+    runs: Mapped[int] = mapped_column(BigInteger, default=0)
+    processed_total: Mapped[int] = mapped_column(BigInteger, default=0)
+    last_processed: Mapped[int] = mapped_column(BigInteger, default=0)
+    last_batches: Mapped[int] = mapped_column(default=0)
+    last_seconds: Mapped[float] = mapped_column(Float, default=0)
+    last_finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = (UniqueConstraint("task_name", name="uq_task_run_task_name"),)
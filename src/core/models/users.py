@@ -6,7 +6,9 @@ from sqlalchemy import (
     CheckConstraint,
     UniqueConstraint,
     DateTime,
+    Index,
     func,
+    text,
 )
 
 from .base import Base
@@ -39,4 +41,37 @@ class User(Base):
             "LENGTH(email) >= 6",
             name="ck_user_email_len_ge_6",
         ),
+        Index("ix_user_created_at", "created_at"),
+        # drives the purge of never-activated accounts, oldest first
+        Index(
+            "ix_user_created_at_not_activated",
+            "created_at",
+            postgresql_where=text("NOT is_activated"),
+        ),
     )
+
+
+# search indexes: text_pattern_ops btrees serve prefix ranges on lower(...),
+# pg_trgm GIN indexes serve substring LIKE '%...%'
+Index(
+    "ix_user_username_lower_pattern",
+    func.lower(User.username).label("username_lower"),
+    postgresql_ops={"username_lower": "text_pattern_ops"},
+)
+Index(
+    "ix_user_email_lower_pattern",
+    func.lower(User.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"},
+)
+Index(
+    "ix_user_username_lower_trgm",
+    func.lower(User.username).label("username_lower"),
+    postgresql_using="gin",
+    postgresql_ops={"username_lower": "gin_trgm_ops"},
+)
+Index(
+    "ix_user_email_lower_trgm",
+    func.lower(User.email).label("email_lower"),
+    postgresql_using="gin",
+    postgresql_ops={"email_lower": "gin_trgm_ops"},
+)
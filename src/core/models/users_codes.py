@@ -1,4 +1,12 @@
-from sqlalchemy import ForeignKey, String, CheckConstraint, UniqueConstraint
+from datetime import datetime
+from sqlalchemy import (
+    ForeignKey,
+    String,
+    CheckConstraint,
+    UniqueConstraint,
+    DateTime,
+    Index,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -10,8 +18,10 @@ class UserCode(Base):
         unique=True,
     )
     code: Mapped[str] = mapped_column(String(6))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
     __table_args__ = (
         CheckConstraint("LENGTH(code) = 6", name="ck_user_code_code_len_eq_6"),
         UniqueConstraint("user_id", name="uq_user_code_user_id"),
+        Index("ix_user_code_expires_at", "expires_at"),
     )
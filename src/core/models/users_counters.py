@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+# one row per is_activated value, kept in step with users by the services that
+# insert, delete or activate users
+class UserCounter(Base):
+    is_activated: Mapped[bool]
+    count: Mapped[int] = mapped_column(BigInteger, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("is_activated", name="uq_user_counter_is_activated"),
+    )
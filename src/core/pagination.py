@@ -0,0 +1,22 @@
+import json
+import base64
+import binascii
+
+from .exc import InvalidCursorException
+
+
+def encode_cursor(**position: int | str) -> str:
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, *keys: str) -> dict[str, int | str]:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, ValueError):
+        raise InvalidCursorException()
+
+    if not isinstance(position, dict) or set(position) != set(keys):
+        raise InvalidCursorException()
+    return position
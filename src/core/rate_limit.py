@@ -0,0 +1,196 @@
+import math
+import time
+from functools import cached_property
+from typing import Any, Callable, Protocol
+
+from core import settings
+from core.cache import TTLCache
+from core.config import RateLimitRuleSettings
+from .exc import RateLimitExceededException
+
+
+class RateLimitBackend(Protocol):
+    # returns 0 when the hit is allowed, otherwise seconds until it would be
+    async def hit(self, key: str, rule: RateLimitRuleSettings) -> float: ...
+
+
+def token_bucket(
+    state: list[float] | None,
+    rule: RateLimitRuleSettings,
+    now: float,
+) -> tuple[list[float], float]:
+    rate = rule.limit / rule.period_seconds
+    tokens, updated_at = state or (rule.limit, now)
+    tokens = min(rule.limit, tokens + (now - updated_at) * rate)
+
+    if tokens >= 1:
+        return [tokens - 1, now], 0.0
+    return [tokens, now], (1 - tokens) / rate
+
+
+# approximated sliding window: the previous fixed window is weighted by how much
+# of it still overlaps the sliding one, so only two counters are kept per key
+def sliding_window(
+    state: list[float] | None,
+    rule: RateLimitRuleSettings,
+    now: float,
+) -> tuple[list[float], float]:
+    period = rule.period_seconds
+    window = now // period
+    elapsed = now - window * period
+    state_window, previous, current = state or (window, 0, 0)
+
+    if state_window != window:
+        previous = current if state_window == window - 1 else 0
+        current = 0
+
+    weight = 1 - elapsed / period
+    if previous * weight + current < rule.limit:
+        return [window, previous, current + 1], 0.0
+
+    if current >= rule.limit or not previous:
+        return [window, previous, current], period - elapsed
+    # time until the weighted previous window has decayed enough
+    retry_after = period * (1 - (rule.limit - current) / previous) - elapsed
+    return [window, previous, current], max(retry_after, 0.001)
+
+
+ALGORITHMS = {
+    "token_bucket": token_bucket,
+    "sliding_window": sliding_window,
+}
+
+
+class InMemoryBackend:
+    def __init__(
+        self, max_keys: int, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.states = TTLCache(max_size=max_keys, ttl=0)
+        self.clock = clock
+
+    async def hit(self, key: str, rule: RateLimitRuleSettings) -> float:
+        state, retry_after = ALGORITHMS[rule.algorithm](
+            self.states.get(key), rule, self.clock()
+        )
+        # a key untouched for two periods is back to its initial state anyway
+        self.states.set(key, state, ttl=rule.period_seconds * 2)
+        return retry_after
+
+
+TOKEN_BUCKET_SCRIPT = """
+local limit, period = tonumber(ARGV[1]), tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = limit / period
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or limit
+local ts = tonumber(state[2]) or now
+tokens = math.min(limit, tokens + (now - ts) * rate)
+local retry_after = 0
+if tokens >= 1 then tokens = tokens - 1 else retry_after = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(period * 2))
+return tostring(retry_after)
+"""
+
+SLIDING_WINDOW_SCRIPT = """
+local limit, period = tonumber(ARGV[1]), tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local window = math.floor(now / period)
+local elapsed = now - window * period
+local current_key = KEYS[1] .. ':' .. window
+local current = tonumber(redis.call('GET', current_key) or '0')
+local previous = tonumber(redis.call('GET', KEYS[1] .. ':' .. (window - 1)) or '0')
+if previous * (1 - elapsed / period) + current < limit then
+    redis.call('INCR', current_key)
+    redis.call('EXPIRE', current_key, math.ceil(period * 2))
+    return '0'
+end
+if current >= limit or previous == 0 then return tostring(period - elapsed) end
+return tostring(math.max(period * (1 - (limit - current) / previous) - elapsed, 0.001))
+"""
+
+
+# any redis.asyncio compatible client; both algorithms run as atomic Lua scripts
+class SharedBackend:
+    def __init__(self, client: Any, prefix: str = "rate-limit:") -> None:
+        self.client = client
+        self.prefix = prefix
+        self.scripts = {
+            "token_bucket": client.register_script(TOKEN_BUCKET_SCRIPT),
+            "sliding_window": client.register_script(SLIDING_WINDOW_SCRIPT),
+        }
+
+    async def hit(self, key: str, rule: RateLimitRuleSettings) -> float:
+        script = self.scripts[rule.algorithm]
+        retry_after = await script(
+            keys=[f"{self.prefix}{rule.algorithm}:{key}"],
+            args=[rule.limit, rule.period_seconds],
+        )
+        return float(retry_after)
+
+
+# the rules and the backend are read from the settings on first use
+class RateLimiter:
+    def __init__(self) -> None:
+        self.checked: dict[str, int] = {}
+        self.rejected: dict[str, int] = {}
+
+    @cached_property
+    def backend(self) -> RateLimitBackend:
+        return create_backend()
+
+    @cached_property
+    def routes(self) -> dict[str, list[RateLimitRuleSettings]]:
+        return settings.rate_limit.routes
+
+    @cached_property
+    def enabled(self) -> bool:
+        return settings.rate_limit.enabled
+
+    # checks every rule of the route whose key was provided, e.g.
+    # await limiter.check("login", ip="10.0.0.1", username="alice")
+    async def check(self, route: str, **keys: Any) -> None:
+        if not self.enabled:
+            return
+
+        self.checked[route] = self.checked.get(route, 0) + 1
+        retry_after = 0.0
+        for idx, rule in enumerate(self.routes.get(route, ())):
+            value = keys.get(rule.key)
+
+            if value is None:
+                continue
+
+            key = f"{route}:{idx}:{rule.key}:{value}"
+            retry_after = max(retry_after, await self.backend.hit(key, rule))
+
+        if retry_after:
+            self.rejected[route] = self.rejected.get(route, 0) + 1
+            raise RateLimitExceededException(math.ceil(retry_after))
+
+    def metrics(self) -> dict[str, dict[str, int]]:
+        return {
+            route: {
+                "checked": checked,
+                "rejected": self.rejected.get(route, 0),
+            }
+            for route, checked in self.checked.items()
+        }
+
+
+def create_backend() -> RateLimitBackend:
+    if settings.rate_limit.shared_url is None:
+        return InMemoryBackend(max_keys=settings.rate_limit.max_keys)
+
+    try:
+        from redis import asyncio as redis
+    except ImportError as e:
+        raise RuntimeError(
+            "'redis' package is required when a shared rate limit url is configured"
+        ) from e
+    return SharedBackend(redis.from_url(settings.rate_limit.shared_url))
+
+
+limiter = RateLimiter()
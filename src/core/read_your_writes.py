@@ -0,0 +1,90 @@
+import hmac
+import math
+import time
+import hashlib
+from functools import lru_cache
+from contextvars import ContextVar
+from typing import Any
+from starlette.requests import cookie_parser
+
+from core import settings
+
+
+COOKIE_NAME = "read_your_writes"
+
+
+class ReadYourWrites:
+    def __init__(self, pinned: bool) -> None:
+        self.pinned = pinned
+        self.committed = False
+
+
+current_read_your_writes: ContextVar[ReadYourWrites | None] = ContextVar(
+    "current_read_your_writes", default=None
+)
+
+
+@lru_cache(maxsize=1)
+def secret_key() -> bytes:
+    secret = settings.db.read_your_writes_secret
+
+    if secret is not None:
+        return secret.get_secret_value().encode()
+    # the database credentials are a secret every worker already shares
+    return hashlib.sha256(settings.db.url.encode()).digest()
+
+
+def sign(until: int) -> str:
+    digest = hmac.new(secret_key(), str(until).encode(), hashlib.sha256)
+    return f"{until}.{digest.hexdigest()}"
+
+
+def verify(value: str) -> bool:
+    until, _, signature = value.partition(".")
+
+    if not until.isdigit() or int(until) < time.time():
+        return False
+    return hmac.compare_digest(sign(int(until)), value)
+
+
+# the pin travels with the client as a signed cookie holding its expiry, so it
+# is honoured by every worker and clients behind one proxy don't share it
+class ReadYourWritesMiddleware:
+    def __init__(self, app: Any) -> None:
+        self.app = app
+        self.ttl = settings.db.read_your_writes_seconds
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or self.ttl <= 0:
+            return await self.app(scope, receive, send)
+
+        state = ReadYourWrites(pinned=self.__is_pinned(scope))
+
+        async def send_with_cookie(message: dict) -> None:
+            if message["type"] == "http.response.start" and state.committed:
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"set-cookie", self.__cookie()),
+                ]
+            await send(message)
+
+        token = current_read_your_writes.set(state)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            current_read_your_writes.reset(token)
+
+    def __cookie(self) -> bytes:
+        max_age = math.ceil(self.ttl)
+        value = sign(int(time.time()) + max_age)
+        return (
+            f"{COOKIE_NAME}={value}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+        ).encode()
+
+    @staticmethod
+    def __is_pinned(scope: dict) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                cookie = cookie_parser(value.decode("latin-1")).get(COOKIE_NAME)
+                return cookie is not None and verify(cookie)
+        return False
@@ -0,0 +1,190 @@
+import time
+import random
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from core import settings
+
+
+class Histogram:
+    def __init__(self, buckets: list[float]) -> None:
+        self.buckets = buckets
+        # the last slot counts observations above the largest bucket (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> list[int]:
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class TimingRegistry:
+    def __init__(self) -> None:
+        self.histograms: dict[str, dict[tuple[tuple[str, str], ...], Histogram]] = {}
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        series = self.histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        histogram = series.get(key)
+
+        if histogram is None:
+            histogram = series[key] = Histogram(settings.timing.buckets)
+        histogram.observe(value)
+
+
+class RequestTiming:
+    __slots__ = ("started_at", "stages")
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.stages: dict[str, list[float]] = {}
+
+    def add(self, name: str, duration: float) -> None:
+        stage = self.stages.get(name)
+
+        if stage is None:
+            self.stages[name] = [duration, 1]
+        else:
+            stage[0] += duration
+            stage[1] += 1
+
+    def server_timing(self) -> str:
+        total = time.perf_counter() - self.started_at
+        parts = [
+            f'{name};dur={duration * 1000:.2f};desc="{count}x"'
+            for name, (duration, count) in self.stages.items()
+        ]
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+registry = TimingRegistry()
+# only set while a sampled request is being handled
+current_timing: ContextVar[RequestTiming | None] = ContextVar(
+    "current_timing", default=None
+)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    timing = current_timing.get()
+
+    if timing is None:
+        yield
+        return
+
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - started_at)
+
+
+def record_stage(name: str, duration: float) -> None:
+    timing = current_timing.get()
+
+    if timing is not None:
+        timing.add(name, duration)
+
+
+# request duration is recorded for every request, per-stage timings and the
+# Server-Timing header only for a sampled share of them
+class TimingMiddleware:
+    def __init__(self, app: Any) -> None:
+        self.app = app
+        self.enabled = settings.timing.enabled
+        self.sample_rate = settings.timing.sample_rate
+        self.server_timing_header = settings.timing.server_timing_header
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            return await self.app(scope, receive, send)
+
+        started_at = time.perf_counter()
+        status = 500
+        timing = None
+        if random.random() < self.sample_rate:
+            timing = RequestTiming()
+
+        async def send_with_timing(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timing is not None and self.server_timing_header:
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        (b"server-timing", timing.server_timing().encode()),
+                    ]
+            await send(message)
+
+        token = current_timing.set(timing)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timing.reset(token)
+            route = scope.get("route")
+            registry.observe(
+                "http_request_duration_seconds",
+                time.perf_counter() - started_at,
+                method=scope["method"],
+                route=route.path if route is not None else "unmatched",
+                status=f"{status // 100}xx",
+            )
+
+            if timing is not None:
+                for name, (duration, _) in timing.stages.items():
+                    registry.observe(
+                        "request_stage_duration_seconds", duration, stage=name
+                    )
+
+
+def escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: tuple[tuple[str, Any], ...]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{escape_label(value)}"' for key, value in labels)
+    return "{" + pairs + "}"
+
+
+# Prometheus text exposition format; gauges are flat {labels: value} snapshots
+# of the stats the monitoring endpoints already expose
+def render_prometheus(
+    gauges: dict[str, dict[tuple[tuple[str, Any], ...], float]],
+    prefix: str = "app_",
+) -> str:
+    lines = []
+
+    for name, series in registry.histograms.items():
+        lines.append(f"# TYPE {prefix}{name} histogram")
+        for labels, histogram in series.items():
+            counts = histogram.cumulative_counts()
+            bounds = [*map(str, histogram.buckets), "+Inf"]
+            for bound, count in zip(bounds, counts):
+                bucket_labels = format_labels((*labels, ("le", bound)))
+                lines.append(f"{prefix}{name}_bucket{bucket_labels} {count}")
+            lines.append(f"{prefix}{name}_sum{format_labels(labels)} {histogram.sum}")
+            lines.append(
+                f"{prefix}{name}_count{format_labels(labels)} {histogram.count}"
+            )
+
+    for name, series in gauges.items():
+        lines.append(f"# TYPE {prefix}{name} gauge")
+        for labels, value in series.items():
+            lines.append(f"{prefix}{name}{format_labels(labels)} {float(value)}")
+
+    return "\n".join(lines) + "\n"
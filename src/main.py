@@ -1,13 +1,38 @@
-import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from core import settings
 from api import main_api_router
+from api.monitoring import metrics_router
+from core.models import helper
+from core.mail import mailer
+from core.hashing import hasher
+from core.timing import TimingMiddleware
+from core.read_your_writes import ReadYourWritesMiddleware
+from api.auth.keys import keyring
+from tasks import get_broker
 
 
-app = FastAPI()
+# runs once per server worker process
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    keyring.load()
+    helper.connect()
+    broker = get_broker()
+    if not broker.is_worker_process:
+        await broker.startup()
+    yield
+    if not broker.is_worker_process:
+        await broker.shutdown()
+    await mailer.close()
+    await helper.dispose()
+    hasher.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(main_api_router)
+app.include_router(metrics_router)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -15,7 +40,29 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(TimingMiddleware)
+
+
+def shared_state_missing() -> list[str]:
+    if settings.server.workers == 1 or settings.server.reload:
+        return []
+
+    missing = []
+    if settings.cache.shared_url is None:
+        missing.append("CACHE__SHARED_URL")
+    if settings.rate_limit.enabled and settings.rate_limit.shared_url is None:
+        missing.append("RATE_LIMIT__SHARED_URL")
+    return missing
 
 
 if __name__ == "__main__":
+    import sys
+    import uvicorn
+
+    if missing := shared_state_missing():
+        sys.exit(
+            f"SERVER__WORKERS={settings.server.workers} needs {', '.join(missing)}: "
+            "revocations, user cache invalidation and rate limits are per process"
+        )
     uvicorn.run(**settings.server.model_dump())
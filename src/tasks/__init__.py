@@ -0,0 +1,9 @@
+__all__ = [
+    "get_broker",
+    "broker_factory",
+    "send_activation_code_task",
+    "send_activation_codes_task",
+]
+
+from .broker import get_broker, broker_factory
+from .email import send_activation_code_task, send_activation_codes_task
@@ -0,0 +1,68 @@
+from functools import lru_cache
+from taskiq import (
+    AsyncBroker,
+    InMemoryBroker,
+    SmartRetryMiddleware,
+    TaskiqEvents,
+    TaskiqState,
+    async_shared_broker,
+)
+
+from core import settings
+from core.mail import mailer
+from core.models import helper
+from .middlewares import DeadLetterMiddleware
+
+
+def create_broker() -> AsyncBroker:
+    if settings.taskiq.broker == "inmemory":
+        broker = InMemoryBroker()
+    else:
+        from taskiq_aio_pika import AioPikaBroker
+
+        broker = AioPikaBroker(
+            url=settings.rabbitmq.url,
+            queue_name=settings.taskiq.queue_name,
+            dead_letter_queue_name=settings.taskiq.dead_letter_queue_name,
+        )
+
+    retry = SmartRetryMiddleware(
+        default_retry_count=settings.taskiq.max_retries,
+        default_delay=settings.taskiq.retry_delay_seconds,
+        use_jitter=True,
+        use_delay_exponent=True,
+        max_delay_exponent=settings.taskiq.max_retry_delay_seconds,
+    )
+    # dead letters are checked first: retrying bumps "_retries" in the labels of
+    # the failed message itself
+    return broker.with_middlewares(
+        DeadLetterMiddleware(
+            queue_name=settings.taskiq.dead_letter_queue_name, retry=retry
+        ),
+        retry,
+    )
+
+
+async def compile_templates(state: TaskiqState) -> None:
+    mailer.renderer
+
+
+async def close_connections(state: TaskiqState) -> None:
+    await mailer.close()
+    await helper.dispose()
+
+
+# tasks are declared on the shared broker, so importing them reads no settings;
+# the configured broker is created on first use and becomes its default
+@lru_cache
+def get_broker() -> AsyncBroker:
+    broker = create_broker()
+    broker.add_event_handler(TaskiqEvents.WORKER_STARTUP, compile_templates)
+    broker.add_event_handler(TaskiqEvents.WORKER_SHUTDOWN, close_connections)
+    async_shared_broker.default_broker(broker)
+    return broker
+
+
+# the taskiq cli only calls plain functions as broker factories
+def broker_factory() -> AsyncBroker:
+    return get_broker()
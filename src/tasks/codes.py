@@ -0,0 +1,27 @@
+import logging
+from taskiq import async_shared_broker
+
+from core import settings
+from core.models import helper
+from api.auth.codes import ActivationCodeStore
+
+
+logger = logging.getLogger(__name__)
+
+
+@async_shared_broker.task
+async def purge_expired_codes_task() -> int:
+    batch_size = settings.codes.purge_batch_size
+    purged = 0
+
+    while True:
+        # every batch in its own short transaction
+        async with helper.session_factory() as session:
+            deleted = await ActivationCodeStore(session).purge_expired(batch_size)
+
+        purged += deleted
+        if deleted < batch_size:
+            break
+
+    logger.info("purged %d expired activation codes", purged)
+    return purged
@@ -0,0 +1,13 @@
+from taskiq import async_shared_broker
+
+from core.mail import mailer
+
+
+@async_shared_broker.task(retry_on_error=True)
+async def send_activation_code_task(confirmation_code: str, recipient: str) -> None:
+    await mailer.send_message(confirmation_code, recipient)
+
+
+@async_shared_broker.task(retry_on_error=True)
+async def send_activation_codes_task(messages: list[tuple[str, str]]) -> list[str]:
+    return await mailer.send_many(messages)
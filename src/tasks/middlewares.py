@@ -0,0 +1,63 @@
+from typing import Any
+from collections import deque
+from aio_pika import Message, DeliveryMode
+from taskiq import SmartRetryMiddleware, TaskiqMiddleware, TaskiqMessage, TaskiqResult
+from taskiq.exceptions import NoResultError
+
+
+# dead-letters every failed task the retry middleware is not going to retry:
+# tasks without retry_on_error, exceptions it doesn't retry and the last attempt.
+# It has to run before the retry middleware, which changes the message labels
+class DeadLetterMiddleware(TaskiqMiddleware):
+    def __init__(self, queue_name: str, retry: SmartRetryMiddleware) -> None:
+        super().__init__()
+        self.queue_name = queue_name
+        self.retry = retry
+        # brokers without an AMQP channel (in-memory) keep dead letters here
+        self.dead_letters: deque[TaskiqMessage] = deque(maxlen=1000)
+
+    async def on_error(
+        self,
+        message: TaskiqMessage,
+        result: TaskiqResult[Any],
+        exception: BaseException,
+    ) -> None:
+        # a task raising NoResultError skips its result, it did not fail
+        if isinstance(exception, NoResultError) or self.__will_retry(
+            message, exception
+        ):
+            return
+
+        channel = getattr(self.broker, "write_channel", None)
+
+        if channel is None:
+            self.dead_letters.append(message)
+            return
+
+        await channel.default_exchange.publish(
+            Message(
+                body=self.broker.formatter.dumps(message).message,
+                headers={
+                    "task_id": message.task_id,
+                    "task_name": message.task_name,
+                    "error": repr(exception),
+                },
+                delivery_mode=DeliveryMode.PERSISTENT,
+            ),
+            routing_key=self.queue_name,
+        )
+
+    # mirrors SmartRetryMiddleware.on_error
+    def __will_retry(self, message: TaskiqMessage, exception: BaseException) -> bool:
+        retry = self.retry
+
+        if retry.types_of_exceptions is not None and not isinstance(
+            exception, tuple(retry.types_of_exceptions)
+        ):
+            return False
+        if not retry.is_retry_on_error(message):
+            return False
+
+        retries = int(message.labels.get("_retries", 0)) + 1
+        max_retries = int(message.labels.get("max_retries", retry.default_retry_count))
+        return retries < max_retries
@@ -0,0 +1,37 @@
+from taskiq import ScheduledTask, ScheduleSource, TaskiqScheduler
+from taskiq.decor import AsyncTaskiqDecoratedTask
+
+from core import settings
+from .broker import get_broker
+from .codes import purge_expired_codes_task
+from .tokens import purge_expired_tokens_task
+from .users import purge_unactivated_users_task
+
+
+# crons are read from the settings when the scheduler starts, not at import
+class SettingsScheduleSource(ScheduleSource):
+    def __init__(self) -> None:
+        self.schedules: list[ScheduledTask] = []
+
+    async def startup(self) -> None:
+        self.schedules = [
+            self.__schedule(
+                purge_unactivated_users_task, settings.stale_users.purge_cron
+            ),
+            self.__schedule(purge_expired_tokens_task, settings.jwt.refresh_purge_cron),
+            self.__schedule(purge_expired_codes_task, settings.codes.purge_cron),
+        ]
+
+    async def get_schedules(self) -> list[ScheduledTask]:
+        return self.schedules
+
+    @staticmethod
+    def __schedule(task: AsyncTaskiqDecoratedTask, cron: str) -> ScheduledTask:
+        return ScheduledTask(
+            task_name=task.task_name, labels=task.labels, args=[], kwargs={}, cron=cron
+        )
+
+
+# the taskiq cli only calls plain functions as scheduler factories
+def scheduler_factory() -> TaskiqScheduler:
+    return TaskiqScheduler(broker=get_broker(), sources=[SettingsScheduleSource()])
@@ -0,0 +1,53 @@
+import time
+import logging
+from typing import Any
+from datetime import datetime, timezone, timedelta
+from taskiq import async_shared_broker
+
+from core import settings
+from core.models import helper
+from api.users.bulk import UserBulkService
+from api.monitoring.task_runs import TaskRunStore
+
+
+logger = logging.getLogger(__name__)
+
+
+@async_shared_broker.task
+async def purge_unactivated_users_task() -> dict[str, Any]:
+    batch_size = settings.stale_users.purge_batch_size
+    created_before = datetime.now(timezone.utc) - timedelta(
+        days=settings.stale_users.max_age_days
+    )
+    started = time.perf_counter()
+    purged = 0
+    batches = 0
+
+    while True:
+        # every batch in its own short transaction
+        async with helper.session_factory() as session:
+            deleted = await UserBulkService(session).purge_unactivated(
+                created_before, batch_size
+            )
+
+        purged += deleted
+        batches += 1
+        if deleted < batch_size:
+            break
+
+    duration = time.perf_counter() - started
+    # the run is stored for /metrics, the app processes do not share our memory
+    async with helper.session_factory() as session:
+        await TaskRunStore(session).record(
+            "purge_unactivated_users", purged, batches, round(duration, 3)
+        )
+        await session.commit()
+
+    logger.info(
+        "purged %d never activated users created before %s in %d batches (%.3fs)",
+        purged,
+        created_before.isoformat(),
+        batches,
+        duration,
+    )
+    return {"purged": purged, "batches": batches, "seconds": round(duration, 3)}
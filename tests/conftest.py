@@ -0,0 +1,75 @@
+import os
+
+# tests only need settings to load, the database is a fresh sqlite file per test
+os.environ.setdefault("DB__HOST", "localhost")
+os.environ.setdefault("DB__PORT", "5432")
+os.environ.setdefault("DB__USER", "test")
+os.environ.setdefault("DB__PASS", "test")
+os.environ.setdefault("DB__NAME", "test")
+os.environ.setdefault("RABBITMQ__USER", "test")
+os.environ.setdefault("RABBITMQ__PASS", "test")
+os.environ.setdefault("TASKIQ__BROKER", "inmemory")
+os.environ.setdefault("HASHING__ROUNDS", "4")
+os.environ.setdefault("RATE_LIMIT__ENABLED", "false")
+
+import bcrypt
+import httpx
+import pytest
+from sqlalchemy import insert, select
+
+import main
+from core.models import Base, User, Profile, UserCounter, helper
+from api.users.cache import user_cache
+from api.auth.revocation import revoked_tokens
+from api.auth.token_cache import verified_tokens
+
+
+PASSWORD = "test-password"
+
+
+# in-memory stand-in for the redis client of the shared cache tier
+class FakeShared:
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, name: str) -> bytes | None:
+        return self.data.get(name)
+
+    async def set(self, name: str, value: bytes, ex: int | None = None) -> None:
+        self.data[name] = value
+
+    async def delete(self, *names: str) -> None:
+        for name in names:
+            self.data.pop(name, None)
+
+
+@pytest.fixture
+async def client(tmp_path):
+    await helper.dispose()
+    helper.url, helper.replica_urls = f"sqlite+aiosqlite:///{tmp_path}/test.db", []
+
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(4)).decode()
+    async with helper.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [{"username": "alice", "email": "alice@example.com", "password": hashed}],
+        )
+        user_ids = (await conn.scalars(select(User.id))).all()
+        await conn.execute(insert(Profile), [{"user_id": idx} for idx in user_ids])
+        await conn.execute(
+            insert(UserCounter),
+            [{"is_activated": False, "count": 1}, {"is_activated": True, "count": 0}],
+        )
+
+    # the process-wide caches would leak users and cutoffs between tests
+    user_cache.local.clear()
+    revoked_tokens.cutoffs.clear()
+    verified_tokens.cache.clear()
+
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            yield client
@@ -0,0 +1,84 @@
+import pytest
+from taskiq import SmartRetryMiddleware
+from taskiq.exceptions import NoResultError
+
+from tasks.broker import create_broker
+from tasks.middlewares import DeadLetterMiddleware
+
+
+class Flaky(Exception):
+    pass
+
+
+def middleware(broker, cls):
+    [found] = [m for m in broker.middlewares if isinstance(m, cls)]
+    return found
+
+
+@pytest.fixture
+async def broker():
+    broker = create_broker()
+    # run every attempt, retries included, inside kiq()
+    broker.await_inplace = True
+    retry = middleware(broker, SmartRetryMiddleware)
+    retry.default_retry_count = 3
+    retry.types_of_exceptions = [Flaky]
+
+    await broker.startup()
+    yield broker
+    await broker.shutdown()
+
+
+def dead_letters(broker) -> list[str]:
+    dead = middleware(broker, DeadLetterMiddleware)
+    return [message.task_name for message in dead.dead_letters]
+
+
+async def test_task_without_retries_is_dead_lettered(broker):
+    @broker.task(task_name="no_retry")
+    async def no_retry() -> None:
+        raise Flaky()
+
+    await no_retry.kiq()
+    assert dead_letters(broker) == ["no_retry"]
+
+
+async def test_error_that_is_not_retried_is_dead_lettered(broker):
+    @broker.task(task_name="broken", retry_on_error=True)
+    async def broken() -> None:
+        raise ValueError()
+
+    await broken.kiq()
+    assert dead_letters(broker) == ["broken"]
+
+
+async def test_task_is_dead_lettered_after_the_last_retry(broker):
+    attempts = []
+
+    @broker.task(task_name="flaky", retry_on_error=True, max_retries=2)
+    async def flaky() -> None:
+        attempts.append(1)
+        raise Flaky()
+
+    await flaky.kiq()
+    assert len(attempts) == 2
+    assert dead_letters(broker) == ["flaky"]
+
+
+async def test_retried_and_skipped_results_are_not_dead_lettered(broker):
+    attempts = []
+
+    @broker.task(task_name="recovers", retry_on_error=True)
+    async def recovers() -> None:
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Flaky()
+
+    @broker.task(task_name="no_result")
+    async def no_result() -> None:
+        raise NoResultError()
+
+    await recovers.kiq()
+    await no_result.kiq()
+    assert len(attempts) == 3
+    assert dead_letters(broker) == []
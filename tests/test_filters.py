@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from api.users.filters import filter_conditions, prefix_upper_bound
+from api.users.schemas import UsersFilterSchema
+
+
+MAX = "\U0010ffff"
+
+
+@pytest.mark.parametrize(
+    "prefix, upper",
+    [
+        ("abc", "abd"),
+        ("ab" + MAX, "ac"),
+        ("ab" + MAX * 3, "ac"),
+        # U+D800..U+DFFF are surrogates and never stored
+        ("a\ud7ff", "a\ue000"),
+        ("\ud7ff" + MAX, "\ue000"),
+        (MAX, None),
+        (MAX * 3, None),
+    ],
+)
+def test_prefix_upper_bound(prefix, upper):
+    assert prefix_upper_bound(prefix) == upper
+
+    if upper is not None:
+        # code point order is the byte order of utf-8, as "~<~" compares
+        assert prefix < prefix + MAX < upper
+        assert upper.encode() > (prefix + MAX).encode()
+
+
+def compiled_params(filters: UsersFilterSchema) -> set[str]:
+    [condition] = filter_conditions(filters)
+    return set(condition.compile(dialect=postgresql.dialect()).params.values())
+
+
+def test_prefix_search_is_a_range():
+    filters = UsersFilterSchema(search="Ali")
+    assert compiled_params(filters) == {"ali", "alj"}
+
+
+def test_prefix_search_without_upper_bound():
+    filters = UsersFilterSchema(search=MAX)
+    [condition] = filter_conditions(filters)
+
+    assert "~<~" not in str(condition.compile(dialect=postgresql.dialect()))
+    assert compiled_params(filters) == {MAX}
+
+
+@pytest.mark.parametrize(
+    "search, pattern",
+    [
+        ("100%", r"%100\%%"),
+        ("a_b_c", r"%a\_b\_c%"),
+        ("a\\b", r"%a\\b%"),
+        ("50%_\\", r"%50\%\_\\%"),
+    ],
+)
+def test_contains_search_escapes_like_wildcards(search, pattern):
+    filters = UsersFilterSchema(search=search, search_mode="contains")
+    assert compiled_params(filters) == {pattern}
+
+
+@pytest.mark.parametrize("path", ["/api/users/", "/api/users/count"])
+@pytest.mark.parametrize("search_mode", ["prefix", "contains"])
+async def test_search_with_nul_is_rejected(client, path, search_mode):
+    response = await client.get(
+        path, params={"search": "ali\x00ce", "search_mode": search_mode}
+    )
+
+    assert response.status_code == 422
+    assert "NUL" in response.text
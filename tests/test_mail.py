@@ -0,0 +1,40 @@
+import email
+from email.policy import default
+
+import pytest
+
+from core.mail import create_renderer
+
+
+@pytest.fixture(scope="module")
+def renderer():
+    return create_renderer()
+
+
+def parse(message) -> email.message.EmailMessage:
+    raw = message if isinstance(message, bytes) else message.as_bytes()
+    return email.message_from_bytes(raw, policy=default)
+
+
+@pytest.mark.parametrize("code", ["0", "123456", "A1B2C3D4", "9" * 120])
+def test_precompiled_message_matches_the_template(renderer, code):
+    assert renderer.precompiled
+
+    message = parse(renderer.render(code, "bob@example.com"))
+
+    assert message["From"] == renderer.sender
+    assert message["To"] == "bob@example.com"
+    assert message["Subject"] == renderer.subject
+    html = message.get_body(("html",)).get_content()
+    assert html == renderer.template.render(code=code)
+    plain = message.get_body(("plain",)).get_content()
+    assert plain.rstrip("\n") == renderer.plain_text.rstrip("\n")
+
+
+def test_non_ascii_recipient_falls_back_to_the_email_package(renderer):
+    message = renderer.render("123456", "бob@example.com")
+
+    assert not isinstance(message, bytes)
+    html = parse(message).get_body(("html",)).get_content()
+    # set_content() ends the part with a newline
+    assert html == renderer.template.render(code="123456") + "\n"
@@ -0,0 +1,31 @@
+import pytest
+from pydantic import SecretStr
+
+from core import settings
+
+
+ADMIN_KEY = "test-admin-key"
+PATHS = ["/metrics", "/api/monitoring/hashing", "/api/monitoring/user-cache"]
+
+
+@pytest.fixture
+def admin_key(monkeypatch):
+    monkeypatch.setattr(settings.admin, "api_key", SecretStr(ADMIN_KEY))
+
+
+@pytest.mark.parametrize("path", PATHS)
+async def test_requires_the_admin_key(client, admin_key, path):
+    response = await client.get(path)
+    assert response.status_code == 401
+
+    response = await client.get(path, headers={"X-Admin-Key": "wrong"})
+    assert response.status_code == 401
+
+    response = await client.get(path, headers={"X-Admin-Key": ADMIN_KEY})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("path", PATHS)
+async def test_disabled_without_an_admin_key(client, path):
+    response = await client.get(path, headers={"X-Admin-Key": ADMIN_KEY})
+    assert response.status_code == 403
@@ -0,0 +1,174 @@
+import pytest
+
+from conftest import PASSWORD
+from core.config import RateLimitRuleSettings
+from core.exc import RateLimitExceededException
+from core.rate_limit import InMemoryBackend, RateLimiter, limiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def rule(algorithm: str, limit: int, period_seconds: float, key: str = "ip"):
+    return RateLimitRuleSettings(
+        key=key, algorithm=algorithm, limit=limit, period_seconds=period_seconds
+    )
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def backend(clock) -> InMemoryBackend:
+    return InMemoryBackend(max_keys=100, clock=clock)
+
+
+async def test_token_bucket_refills_over_time(backend, clock):
+    bucket = rule("token_bucket", limit=2, period_seconds=4)
+
+    assert await backend.hit("k", bucket) == 0
+    assert await backend.hit("k", bucket) == 0
+    assert await backend.hit("k", bucket) == pytest.approx(2)
+
+    # half a token refilled
+    clock.now = 1
+    assert await backend.hit("k", bucket) == pytest.approx(1)
+
+    clock.now = 2
+    assert await backend.hit("k", bucket) == 0
+    assert await backend.hit("k", bucket) == pytest.approx(2)
+
+
+async def test_token_bucket_burst_is_capped_at_the_limit(backend, clock):
+    bucket = rule("token_bucket", limit=2, period_seconds=4)
+    await backend.hit("k", bucket)
+
+    clock.now = 100
+    assert await backend.hit("k", bucket) == 0
+    assert await backend.hit("k", bucket) == 0
+    assert await backend.hit("k", bucket) > 0
+
+
+async def test_token_bucket_keys_are_independent(backend):
+    bucket = rule("token_bucket", limit=1, period_seconds=10)
+
+    assert await backend.hit("a", bucket) == 0
+    assert await backend.hit("a", bucket) == pytest.approx(10)
+    assert await backend.hit("b", bucket) == 0
+
+
+async def test_sliding_window_rejects_until_the_window_ends(backend, clock):
+    window = rule("sliding_window", limit=2, period_seconds=10)
+
+    assert await backend.hit("k", window) == 0
+    assert await backend.hit("k", window) == 0
+    assert await backend.hit("k", window) == pytest.approx(10)
+
+    clock.now = 5
+    assert await backend.hit("k", window) == pytest.approx(5)
+
+
+async def test_sliding_window_weights_the_previous_window(backend, clock):
+    window = rule("sliding_window", limit=2, period_seconds=10)
+    await backend.hit("k", window)
+    await backend.hit("k", window)
+
+    # 80% of the previous window overlaps: 2 * 0.8 + 0 < 2
+    clock.now = 12
+    assert await backend.hit("k", window) == 0
+    # 2 * 0.8 + 1 >= 2 until the weight drops below 0.5, 3s later
+    assert await backend.hit("k", window) == pytest.approx(3)
+
+    clock.now = 15.5
+    assert await backend.hit("k", window) == 0
+
+
+async def test_sliding_window_forgets_windows_older_than_the_previous(backend, clock):
+    window = rule("sliding_window", limit=2, period_seconds=10)
+    for _ in range(3):
+        await backend.hit("k", window)
+
+    clock.now = 31
+    assert await backend.hit("k", window) == 0
+    assert await backend.hit("k", window) == 0
+    assert await backend.hit("k", window) == pytest.approx(9)
+
+
+def create_limiter(backend: InMemoryBackend) -> RateLimiter:
+    rate_limiter = RateLimiter()
+    rate_limiter.enabled = True
+    rate_limiter.backend = backend
+    rate_limiter.routes = {
+        "login": [
+            rule("token_bucket", limit=1, period_seconds=10),
+            rule("sliding_window", limit=3, period_seconds=60, key="username"),
+        ],
+    }
+    return rate_limiter
+
+
+async def test_check_raises_with_the_longest_retry_after(backend, clock):
+    rate_limiter = create_limiter(backend)
+
+    await rate_limiter.check("login", ip="10.0.0.1", username="alice")
+    await rate_limiter.check("login", ip="10.0.0.2", username="alice")
+    await rate_limiter.check("login", ip="10.0.0.3", username="alice")
+
+    clock.now = 0.5
+    with pytest.raises(RateLimitExceededException) as e:
+        await rate_limiter.check("login", ip="10.0.0.1", username="alice")
+
+    # ip retries in 9.5s, username at the end of the 60s window
+    assert e.value.headers == {"Retry-After": "60"}
+    assert rate_limiter.metrics() == {"login": {"checked": 4, "rejected": 1}}
+
+
+async def test_check_rounds_retry_after_up(backend, clock):
+    rate_limiter = create_limiter(backend)
+    await rate_limiter.check("login", ip="10.0.0.1")
+
+    clock.now = 0.5
+    with pytest.raises(RateLimitExceededException) as e:
+        await rate_limiter.check("login", ip="10.0.0.1")
+    assert e.value.headers == {"Retry-After": "10"}
+
+
+async def test_check_skips_rules_without_a_key(backend):
+    rate_limiter = create_limiter(backend)
+
+    for _ in range(5):
+        await rate_limiter.check("login", ip=None, username=None)
+        await rate_limiter.check("unknown", ip="10.0.0.1")
+
+
+async def test_check_does_nothing_when_disabled(backend):
+    rate_limiter = create_limiter(backend)
+    rate_limiter.enabled = False
+
+    for _ in range(5):
+        await rate_limiter.check("login", ip="10.0.0.1")
+    assert rate_limiter.metrics() == {}
+
+
+async def test_login_over_the_limit_gets_429(client, monkeypatch, backend):
+    monkeypatch.setattr(limiter, "enabled", True)
+    monkeypatch.setattr(limiter, "backend", backend)
+    monkeypatch.setattr(
+        limiter, "routes", {"login": [rule("token_bucket", 2, period_seconds=60)]}
+    )
+    credentials = {"username": "alice", "password": PASSWORD}
+
+    for _ in range(2):
+        response = await client.post("/api/auth/login", json=credentials)
+        assert response.status_code == 200
+
+    response = await client.post("/api/auth/login", json=credentials)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
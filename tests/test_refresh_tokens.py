@@ -0,0 +1,72 @@
+from conftest import PASSWORD
+
+
+async def login(client) -> dict[str, str]:
+    response = await client.post(
+        "/api/auth/login", json={"username": "alice", "password": PASSWORD}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def bearer(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_refresh_rotates_the_token_pair(client):
+    tokens = await login(client)
+
+    response = await client.get(
+        "/api/auth/refresh", headers=bearer(tokens["refresh_token"])
+    )
+
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    response = await client.get(
+        "/api/auth/refresh", headers=bearer(rotated["refresh_token"])
+    )
+    assert response.status_code == 200
+
+
+async def test_reused_refresh_token_revokes_all_sessions(client):
+    tokens = await login(client)
+    response = await client.get(
+        "/api/auth/refresh", headers=bearer(tokens["refresh_token"])
+    )
+    rotated = response.json()
+
+    response = await client.get(
+        "/api/auth/refresh", headers=bearer(tokens["refresh_token"])
+    )
+    assert response.status_code == 401
+
+    # the rotated pair was issued before the reuse, so it is revoked as well
+    response = await client.get(
+        "/api/auth/refresh", headers=bearer(rotated["refresh_token"])
+    )
+    assert response.status_code == 401
+    response = await client.post(
+        "/api/auth/logout", headers=bearer(rotated["access_token"])
+    )
+    assert response.status_code == 401
+
+
+async def test_login_right_after_revocation_is_accepted(client):
+    tokens = await login(client)
+    response = await client.post(
+        "/api/auth/logout", headers=bearer(tokens["access_token"])
+    )
+    assert response.status_code == 204
+
+    response = await client.post(
+        "/api/auth/logout", headers=bearer(tokens["access_token"])
+    )
+    assert response.status_code == 401
+
+    # issued within the same second as the cutoff
+    tokens = await login(client)
+    response = await client.post(
+        "/api/auth/logout", headers=bearer(tokens["access_token"])
+    )
+    assert response.status_code == 204
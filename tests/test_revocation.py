@@ -0,0 +1,90 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from conftest import FakeShared
+from core.models import User
+from api.auth.keys import keyring
+from api.auth.revocation import RevocationList
+from api.auth.schemas import JWTType, PayloadSchema
+from api.auth.service import AuthAPIService
+
+
+def payload(issued_at: float) -> PayloadSchema:
+    iat = datetime.fromtimestamp(issued_at, timezone.utc)
+    return PayloadSchema(
+        sub="1",
+        email="alice@example.com",
+        is_activated=True,
+        iat=iat,
+        exp=iat + timedelta(minutes=10),
+        typ=JWTType.ACCESS,
+    )
+
+
+def local_list() -> RevocationList:
+    revocations = RevocationList()
+    revocations.shared = None
+    return revocations
+
+
+async def test_tokens_issued_up_to_the_cutoff_are_revoked():
+    revocations = local_list()
+    before = time.time()
+
+    await revocations.revoke_user(1)
+
+    assert await revocations.is_revoked(payload(before))
+    assert await revocations.is_revoked(payload(revocations.cutoffs.get(1) - 0.001))
+    assert revocations.rejected == 2
+
+
+async def test_tokens_issued_after_the_cutoff_in_the_same_second_are_valid():
+    revocations = local_list()
+
+    await revocations.revoke_user(1)
+    cutoff = revocations.cutoffs.get(1)
+
+    assert not await revocations.is_revoked(payload(cutoff + 0.001))
+
+
+async def test_other_users_are_not_revoked():
+    revocations = local_list()
+
+    await revocations.revoke_user(2)
+
+    assert not await revocations.is_revoked(payload(time.time() - 60))
+
+
+def test_signed_tokens_keep_a_sub_second_iat():
+    keyring.load()
+    service = AuthAPIService(session=None)  # token helpers never touch the session
+    user = User(id=1, email="alice@example.com", is_activated=True)
+
+    issued = service.create_payload(token_type=JWTType.ACCESS, user=user)
+    decoded = service.verify_jwt(service.encode_jwt(issued))
+
+    assert decoded.iat == issued.iat
+
+
+async def test_cutoffs_are_shared_between_processes():
+    shared = FakeShared()
+    revoking, other = RevocationList(), RevocationList()
+    revoking.shared = other.shared = shared
+    before = time.time()
+
+    await revoking.revoke_user(1)
+
+    assert await other.is_revoked(payload(before))
+    assert not await other.is_revoked(payload(time.time() + 0.001))
+    # the second check was answered from the local tier
+    assert other.shared_lookups == 1
+
+
+async def test_missing_shared_cutoffs_are_cached_locally():
+    revocations = RevocationList()
+    revocations.shared = FakeShared()
+
+    for _ in range(3):
+        assert not await revocations.is_revoked(payload(time.time()))
+
+    assert revocations.shared_lookups == 1
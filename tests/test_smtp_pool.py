@@ -0,0 +1,94 @@
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from core.mail import Mailer, SMTPPool
+
+
+class Handler:
+    def __init__(self) -> None:
+        # one peer (host, port) per client connection
+        self.peers: list[tuple[str, int]] = []
+        self.fail_noop = False
+        self.drop_next_mail = False
+
+    async def handle_MAIL(self, server, session, envelope, address, options) -> str:
+        if self.drop_next_mail:
+            # the pooled connection dies while it is being used
+            self.drop_next_mail = False
+            server.transport.close()
+        envelope.mail_from = address
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope) -> str:
+        self.peers.append(session.peer)
+        return "250 OK"
+
+    async def handle_NOOP(self, server, session, envelope, arg) -> str:
+        if self.fail_noop:
+            return "421 closing connection"
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def server():
+    handler = Handler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller
+    controller.stop()
+
+
+def create_mailer(server, health_check_after: float = 60) -> Mailer:
+    mailer = Mailer()
+    mailer.pool = SMTPPool(
+        hostname=server.hostname,
+        port=server.port,
+        size=2,
+        idle_timeout=60,
+        health_check_after=health_check_after,
+    )
+    return mailer
+
+
+async def test_connection_is_reused_across_sends(server):
+    mailer = create_mailer(server)
+
+    for _ in range(3):
+        await mailer.send_message("123456", "bob@example.com")
+    await mailer.close()
+
+    peers = server.handler.peers
+    assert len(peers) == 3
+    assert len(set(peers)) == 1
+
+
+async def test_failed_health_check_evicts_the_connection(server):
+    mailer = create_mailer(server, health_check_after=0)
+    await mailer.send_message("123456", "bob@example.com")
+
+    server.handler.fail_noop = True
+    await mailer.send_message("123456", "bob@example.com")
+    await mailer.close()
+
+    first, second = server.handler.peers
+    assert first != second
+
+
+async def test_reconnects_after_the_server_drops_the_connection(server):
+    mailer = create_mailer(server)
+    await mailer.send_message("123456", "bob@example.com")
+
+    server.handler.drop_next_mail = True
+    await mailer.send_message("123456", "bob@example.com")
+    await mailer.close()
+
+    first, second = server.handler.peers
+    assert first != second
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from conftest import FakeShared
+from core.models import User, UserCode, helper
+from api.auth.codes import ActivationCodeStore
+from api.auth.schemas import ConfirmCodeSchema, JWTType, PayloadSchema
+from api.auth.service import AuthAPIService
+from api.users import bulk
+from api.users.cache import user_cache
+from api.users.schemas import BulkUsersSchema, PartialUpdateUserSchema
+from api.users.service import UserAPIService
+
+
+CODE = "123456"
+
+
+class FailingShared(FakeShared):
+    async def delete(self, *names: str) -> None:
+        raise ConnectionError("redis is down")
+
+
+# sqlite has neither "= ANY(array)" nor DML inside a CTE
+async def redeem(self, user_id: int, code: str):
+    redeemed = await self.session.scalar(
+        delete(UserCode)
+        .where(UserCode.user_id == user_id, UserCode.code == code)
+        .returning(UserCode.user_id)
+    )
+    if redeemed is None:
+        return None
+
+    result = await self.session.execute(
+        update(User)
+        .where(User.id == user_id, User.is_activated.is_(False))
+        .values(is_activated=True)
+        .returning(User.id, User.email, User.is_activated)
+        .execution_options(synchronize_session=False)
+    )
+    return result.one_or_none()
+
+
+@pytest.fixture
+async def shared(client, monkeypatch) -> FakeShared:
+    monkeypatch.setattr(bulk, "any_id", lambda column, ids: column.in_(ids))
+    monkeypatch.setattr(ActivationCodeStore, "redeem", redeem)
+    shared = FakeShared()
+    monkeypatch.setattr(user_cache, "shared", shared)
+    return shared
+
+
+async def prime() -> int:
+    async with helper.session_factory() as session:
+        user = await session.scalar(select(User).where(User.username == "alice"))
+        session.add(
+            UserCode(
+                user_id=user.id,
+                code=CODE,
+                expires_at=datetime.now(timezone.utc) + timedelta(minutes=10),
+            )
+        )
+        await session.commit()
+        await user_cache.set(user)
+
+    assert await user_cache.get(user.id) is not None
+    return user.id
+
+
+async def update_user(service: UserAPIService, user_id: int) -> None:
+    await service.update_user(user_id, PartialUpdateUserSchema(username="bob"))
+
+
+async def delete_user(service: UserAPIService, user_id: int) -> None:
+    await service.delete_user(user_id)
+
+
+async def bulk_activate(service: UserAPIService, user_id: int) -> None:
+    async for _ in bulk.UserBulkService(service.session).run(
+        "activate", BulkUsersSchema(ids=[user_id])
+    ):
+        pass
+
+
+async def bulk_delete(service: UserAPIService, user_id: int) -> None:
+    async for _ in bulk.UserBulkService(service.session).run(
+        "delete", BulkUsersSchema(ids=[user_id])
+    ):
+        pass
+
+
+async def redeem_code(service: UserAPIService, user_id: int) -> None:
+    iat = datetime.now(timezone.utc)
+    payload = PayloadSchema(
+        sub=str(user_id),
+        email="alice@example.com",
+        is_activated=False,
+        iat=iat,
+        exp=iat + timedelta(minutes=10),
+        typ=JWTType.ACCESS,
+    )
+    await AuthAPIService(service.session).activate_user(
+        payload, ConfirmCodeSchema(code=CODE)
+    )
+
+
+@pytest.mark.parametrize(
+    "mutate", [update_user, delete_user, bulk_activate, bulk_delete, redeem_code]
+)
+async def test_committed_mutation_invalidates_the_user(shared, mutate):
+    user_id = await prime()
+    assert shared.data
+
+    async with helper.session_factory() as session:
+        await mutate(UserAPIService(session), user_id)
+
+    # the shared tier is cleared by a background task
+    await asyncio.sleep(0)
+    assert not shared.data
+    assert await user_cache.get(user_id) is None
+
+
+async def test_rollback_keeps_the_cached_user(shared):
+    user_id = await prime()
+
+    async with helper.session_factory() as session:
+        user = await session.get(User, user_id)
+        user.username = "bob"
+        await session.flush()
+        await session.rollback()
+
+    assert shared.data
+    assert (await user_cache.get(user_id)).username == "alice"
+
+
+async def test_failed_shared_delete_is_logged(client, monkeypatch, caplog):
+    monkeypatch.setattr(user_cache, "shared", FailingShared())
+
+    user_cache.invalidate([1])
+    # one step runs the delete, the next one its done callbacks
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    [record] = [r for r in caplog.records if r.name == "api.users.cache"]
+    assert record.levelno == logging.ERROR
+    assert isinstance(record.exc_info[1], ConnectionError)